@@ -0,0 +1,63 @@
+"""Compare two benchmark results files from run.py.
+
+    python benchmarks/compare.py results/old.json results/new.json
+
+Prints each throughput and latency figure side by side with the relative
+change; for latencies lower is better, for everything else higher is.
+"""
+import argparse
+import json
+
+# (path into "results", lower is better)
+FIGURES = [
+    (("ingest", "rows_per_sec"), False),
+    (("validator", "probes_per_sec"), False),
+    (("scanner", "candidates_per_sec"), False),
+]
+
+def _figures(report: dict) -> list[tuple[tuple[str, ...], bool]]:
+    figures = list(FIGURES)
+    for strategy in report["results"].get("get", {}):
+        figures += [
+            (("get", strategy, "qps"), False),
+            (("get", strategy, "p50_ms"), True),
+            (("get", strategy, "p99_ms"), True),
+        ]
+    return figures
+
+def _lookup(report: dict, path: tuple[str, ...]) -> float | None:
+    value = report["results"]
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark results files.")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    args = parser.parse_args(argv)
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"{'':<24} {old['commit'] or 'old':>12} {new['commit'] or 'new':>12}   change")
+    seen = set()
+    for path, lower_is_better in _figures(old) + _figures(new):
+        if path in seen:
+            continue
+        seen.add(path)
+        before, after = _lookup(old, path), _lookup(new, path)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        better = change < 0 if lower_is_better else change > 0
+        mark = "+" if better and abs(change) >= 1 else "-" if abs(change) >= 1 else " "
+        print(f"{'.'.join(path):<24} {before:>12,.2f} {after:>12,.2f}   {change:+6.1f}% {mark}")
+    if old["params"] != new["params"]:
+        print("[!] The two runs used different parameters.")
+
+if __name__ == "__main__":
+    main()
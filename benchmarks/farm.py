@@ -0,0 +1,151 @@
+"""Local stand-ins for the internet: a fake-proxy farm and an HTTP target."""
+import asyncio
+import random
+import resource
+
+
+async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Copy bytes one way until EOF."""
+    try:
+        while data := await reader.read(65536):
+            writer.write(data)
+            await writer.drain()
+    except Exception:
+        pass
+    finally:
+        writer.close()
+
+
+async def _relay(client_r, client_w, host: str, port: int) -> None:
+    """Connect to host:port and relay both directions."""
+    target_r, target_w = await asyncio.open_connection(host, port)
+    await asyncio.gather(_pipe(client_r, target_w), _pipe(target_r, client_w))
+
+
+class Target:
+    """Local HTTP target answering every GET with a small JSON body, like httpbin.org/get."""
+
+    BODY = b'{"origin": "127.0.0.1"}'
+
+    def __init__(self):
+        self.server: asyncio.Server | None = None
+        self.port = 0
+
+    async def start(self, host: str = "127.0.0.1") -> str:
+        self.server = await asyncio.start_server(self._handle, host, 0, backlog=4096)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return f"http://{host}:{self.port}/get"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nServer: bench\r\n"
+                b"Content-Length: " + str(len(self.BODY)).encode() + b"\r\nConnection: close\r\n\r\n" + self.BODY
+            )
+            await writer.drain()
+        except Exception:
+            pass
+        finally:
+            writer.close()
+
+    async def close(self) -> None:
+        if self.server:
+            self.server.close()
+
+
+class ProxyFarm:
+    """Thousands of local fake proxies, one listener each.
+
+    Each listener speaks one protocol (HTTP forward/CONNECT or SOCKS5),
+    waits `latency` seconds (± `jitter` as a fraction) before answering, and
+    drops a `failure_rate` share of connections. Requests are really relayed
+    to their destination, normally the local Target.
+    """
+
+    def __init__(self, size: int, latency: float = 0.05, jitter: float = 0.5,
+                 failure_rate: float = 0.1, protocols: tuple[str, ...] = ("http",), seed: int = 0):
+        self.size = size
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.protocols = protocols
+        self.rng = random.Random(seed)
+        self.servers: list[asyncio.Server] = []
+        self.proxies: list[tuple[str, int, str]] = []  # (host, port, protocol)
+
+    async def start(self, host: str = "127.0.0.1") -> list[tuple[str, int, str]]:
+        # One socket per listener plus two per relayed connection
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        for i in range(self.size):
+            protocol = self.protocols[i % len(self.protocols)]
+            handler = self._http if protocol == "http" else self._socks5
+            server = await asyncio.start_server(handler, host, 0, backlog=1024)
+            self.servers.append(server)
+            self.proxies.append((host, server.sockets[0].getsockname()[1], protocol))
+        return self.proxies
+
+    async def close(self) -> None:
+        for server in self.servers:
+            server.close()
+
+    async def _misbehave(self, writer: asyncio.StreamWriter) -> bool:
+        """Wait out the latency; return True (after closing) if this connection should fail."""
+        delay = self.latency * (1 + self.jitter * (2 * self.rng.random() - 1))
+        await asyncio.sleep(max(delay, 0))
+        if self.rng.random() < self.failure_rate:
+            writer.close()
+            return True
+        return False
+
+    async def _http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            if await self._misbehave(writer):
+                return
+            method, uri, _ = head.split(b"\r\n", 1)[0].decode("latin-1").split(" ", 2)
+            if method == "CONNECT":
+                host, _, port = uri.rpartition(":")
+                writer.write(b"HTTP/1.1 200 Connection established\r\n\r\n")
+                await writer.drain()
+                await _relay(reader, writer, host, int(port))
+                return
+            # Absolute-form GET: forward in origin form
+            rest = uri.split("://", 1)[1]
+            address, _, path = rest.partition("/")
+            host, _, port = address.partition(":")
+            target_r, target_w = await asyncio.open_connection(host, int(port or 80))
+            target_w.write(
+                f"{method} /{path} HTTP/1.1\r\nHost: {address}\r\nConnection: close\r\n\r\n".encode()
+            )
+            await target_w.drain()
+            await _pipe(target_r, writer)
+            target_w.close()
+        except Exception:
+            writer.close()
+
+    async def _socks5(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            version, methods = await reader.readexactly(2)
+            await reader.readexactly(methods)
+            if version != 5:
+                writer.close()
+                return
+            if await self._misbehave(writer):
+                return
+            writer.write(b"\x05\x00")
+            _, _, _, kind = await reader.readexactly(4)
+            if kind == 1:
+                host = ".".join(str(b) for b in await reader.readexactly(4))
+            elif kind == 3:
+                host = (await reader.readexactly((await reader.readexactly(1))[0])).decode()
+            else:
+                writer.close()
+                return
+            port = int.from_bytes(await reader.readexactly(2), "big")
+            writer.write(b"\x05\x00\x00\x01" + b"\x00" * 6)
+            await writer.drain()
+            await _relay(reader, writer, host, port)
+        except Exception:
+            writer.close()
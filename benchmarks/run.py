@@ -0,0 +1,304 @@
+"""Benchmark the hot paths against a local fake-proxy farm.
+
+Nothing leaves the machine: a ProxyFarm (farm.py) of local listeners
+stands in for the proxies, a local Target for httpbin, and the memory
+backend for Redis (or a real local Redis with --backend redis, which writes
+to the configured REDIS_DB, so point it at a throwaway one). Measures:
+
+- ingest: storage.add_many rows/sec
+- validator: probes/sec through the validation pipeline, results included
+- get: /get QPS and latency percentiles, per strategy
+- scanner: fetch-proxy-by-scan candidates/sec in streaming mode
+
+Results are written as JSON, tagged with the commit, so runs can be compared
+with compare.py. Settings are read from the environment as usual, e.g.
+VALIDATE_CONCURRENCY=500 python benchmarks/run.py
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import io
+import itertools
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.append(str(ROOT / "fetch-proxy-by-scan" / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from farm import ProxyFarm, Target
+
+BENCHES = ("ingest", "validator", "get", "scanner")
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def bench_ingest(args) -> dict:
+    from proxy_pool.core.storage import storage
+    from proxy_pool.schemas.proxy import Proxy
+    from proxy_pool.utils.config import settings
+
+    # Distinct addresses in 10.0.0.0/8 that no other bench will probe
+    proxies = [
+        Proxy(host=f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}", port=8080, source="bench-ingest")
+        for i in range(args.rows)
+    ]
+    size = settings.INGEST_BATCH_SIZE
+    start = time.perf_counter()
+    added = 0
+    for i in range(0, len(proxies), size):
+        added += await storage.add_many(proxies[i:i + size])
+    elapsed = time.perf_counter() - start
+    return {"rows": args.rows, "added": added, "seconds": elapsed, "rows_per_sec": args.rows / elapsed}
+
+async def bench_validator(args, farm: list[tuple[str, int, str]], target_url: str) -> dict:
+    from proxy_pool.core.storage import storage
+    from proxy_pool.core.validator import validator
+    from proxy_pool.schemas.proxy import Proxy, ProxyRecord
+    from proxy_pool.utils import metrics
+
+    # The validator speaks HTTP proxy only
+    listeners = [(host, port) for host, port, protocol in farm if protocol == "http"]
+    if not listeners:
+        return {"skipped": "no http listeners in the farm"}
+    await storage.add_many([Proxy(host=h, port=p, source="bench-farm") for h, p in listeners])
+    records = [ProxyRecord(h, p, 10, source="bench-farm") for h, p in listeners]
+
+    async def source():
+        for record in itertools.islice(itertools.cycle(records), args.probes):
+            yield record
+
+    ok, fail = metrics.PROBES.labels("bench-farm", "ok"), metrics.PROBES.labels("bench-farm", "fail")
+    ok_before, fail_before = ok.value, fail.value
+    validator.test_url = target_url
+    start = time.perf_counter()
+    try:
+        total = await validator._run(source())
+    finally:
+        await validator.close()
+    elapsed = time.perf_counter() - start
+    passed = ok.value - ok_before
+    return {
+        "probes": total,
+        "passed": int(passed),
+        "failed": int(fail.value - fail_before),
+        "seconds": elapsed,
+        "probes_per_sec": total / elapsed,
+    }
+
+async def bench_get(args) -> dict:
+    import aiohttp
+    import uvicorn
+    from proxy_pool.app import app
+
+    port = _free_port()
+    # lifespan off: the storage is already started and shared with the other benches
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, lifespan="off",
+                                           log_level="warning", access_log=False))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    results = {}
+    try:
+        connector = aiohttp.TCPConnector(limit=args.get_concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            for strategy in args.strategies:
+                url = f"http://127.0.0.1:{port}/get?strategy={strategy}"
+                latencies: list[float] = []
+                errors = 0
+                deadline = time.perf_counter() + args.duration
+
+                async def client():
+                    nonlocal errors
+                    while time.perf_counter() < deadline:
+                        start = time.perf_counter()
+                        async with session.get(url) as response:
+                            await response.read()
+                            if response.status != 200:
+                                errors += 1
+                        latencies.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                await asyncio.gather(*(client() for _ in range(args.get_concurrency)))
+                elapsed = time.perf_counter() - start
+                results[strategy] = {
+                    "requests": len(latencies),
+                    "errors": errors,
+                    "seconds": elapsed,
+                    "qps": len(latencies) / elapsed,
+                    "p50_ms": _percentile(latencies, 0.50) * 1000,
+                    "p99_ms": _percentile(latencies, 0.99) * 1000,
+                }
+    finally:
+        server.should_exit = True
+        await serving
+    return results
+
+async def bench_scanner(args, farm: list[tuple[str, int, str]], target_url: str) -> dict:
+    from checkpoint import Checkpoint
+    from scanner import ProxyScanner
+    from shards import ShardedScanner
+
+    addresses = [f"{protocol}://{host}:{port}" for host, port, protocol in farm]
+
+    async def candidates():
+        for candidate in itertools.islice(itertools.cycle(addresses), args.candidates):
+            yield candidate
+
+    if args.scan_workers > 1:
+        scanner = ShardedScanner(target_url, limit=args.scan_concurrency, timeout=args.timeout, workers=args.scan_workers)
+    else:
+        scanner = ProxyScanner(target_url, limit=args.scan_concurrency, timeout=args.timeout)
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = Checkpoint(os.path.join(tmp, "scan.checkpoint"))
+        start = time.perf_counter()
+        # The scanner narrates on stdout; keep stdout for the summary
+        with contextlib.redirect_stdout(sys.stderr):
+            found = await scanner.run_stream(candidates(), io.StringIO(), checkpoint)
+        elapsed = time.perf_counter() - start
+    return {
+        "candidates": args.candidates,
+        "found": found,
+        "seconds": elapsed,
+        "candidates_per_sec": args.candidates / elapsed,
+    }
+
+async def run(args) -> dict:
+    from proxy_pool.core.storage import storage
+    from proxy_pool.utils.config import settings
+
+    target = Target()
+    target_url = await target.start()
+    farm = ProxyFarm(args.proxies, latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+                     protocols=tuple(args.protocols), seed=args.seed)
+    results = {}
+    await storage.start()
+    try:
+        listeners = await farm.start() if {"validator", "scanner"} & set(args.only) else []
+        for name in BENCHES:
+            if name not in args.only:
+                continue
+            print(f"[*] {name}...", file=sys.stderr)
+            if name == "ingest":
+                results[name] = await bench_ingest(args)
+            elif name == "validator":
+                results[name] = await bench_validator(args, listeners, target_url)
+            elif name == "get":
+                results[name] = await bench_get(args)
+            elif name == "scanner":
+                results[name] = await bench_scanner(args, listeners, target_url)
+    finally:
+        await farm.close()
+        await target.close()
+        await storage.close()
+
+    settings_used = {
+        name: getattr(settings, name)
+        for name in ("STORAGE_BACKEND", "INGEST_BATCH_SIZE", "VALIDATE_CONCURRENCY",
+                     "VALIDATE_QUEUE_SIZE", "VALIDATE_FLUSH_SIZE", "CACHE_ENABLED")
+    }
+    return {"settings": settings_used, "results": results}
+
+def _summary(report: dict) -> str:
+    lines = [f"commit {report['commit'] or 'unknown'}{' (dirty)' if report['dirty'] else ''}"]
+    results = report["results"]
+    if "ingest" in results:
+        lines.append(f"ingest     {results['ingest']['rows_per_sec']:>12,.0f} rows/s")
+    if "validator" in results and "probes_per_sec" in results["validator"]:
+        r = results["validator"]
+        lines.append(f"validator  {r['probes_per_sec']:>12,.0f} probes/s  ({r['passed']} passed, {r['failed']} failed)")
+    for strategy, r in results.get("get", {}).items():
+        lines.append(f"get {strategy:<8} {r['qps']:>10,.0f} req/s     p50 {r['p50_ms']:.2f} ms  p99 {r['p99_ms']:.2f} ms")
+    if "scanner" in results:
+        r = results["scanner"]
+        lines.append(f"scanner    {r['candidates_per_sec']:>12,.0f} candidates/s  ({r['found']} found)")
+    return "\n".join(lines)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark proxy-pool against a local fake-proxy farm.")
+    parser.add_argument("--only", default=",".join(BENCHES), help=f"Comma-separated benches to run ({','.join(BENCHES)})")
+    parser.add_argument("--backend", choices=["memory", "redis"], default="memory", help="Storage backend (default: memory)")
+    parser.add_argument("-o", "--output", help="Results file (default: benchmarks/results/<time>-<commit>.json)")
+    # Farm
+    parser.add_argument("--proxies", type=int, default=1000, help="Fake proxy listeners in the farm")
+    parser.add_argument("--protocols", default="http,socks5", help="Listener protocols, assigned round-robin")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds each proxy waits before answering")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Latency spread, as a fraction of --latency")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="Share of connections a proxy drops")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the farm's latency and failures")
+    # Benches
+    parser.add_argument("--rows", type=int, default=100_000, help="Proxies written by the ingest bench")
+    parser.add_argument("--probes", type=int, default=5000, help="Probes made by the validator bench")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of load per /get strategy")
+    parser.add_argument("--strategies", default="best,fastest,weighted", help="/get strategies to load")
+    parser.add_argument("--get-concurrency", type=int, default=50, help="Concurrent /get clients")
+    parser.add_argument("--candidates", type=int, default=5000, help="Candidates fed to the scanner bench")
+    parser.add_argument("--scan-concurrency", type=int, default=500, help="Scanner probe concurrency")
+    parser.add_argument("--scan-workers", type=int, default=1, help="Scanner worker processes")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Scanner probe timeout in seconds")
+    args = parser.parse_args(argv)
+    args.only = [name for name in args.only.split(",") if name]
+    args.protocols = [p for p in args.protocols.split(",") if p]
+    args.strategies = [s for s in args.strategies.split(",") if s]
+    unknown = set(args.only) - set(BENCHES) or set(args.protocols) - {"http", "socks5"}
+    if unknown:
+        parser.error(f"Unknown value(s): {', '.join(sorted(unknown))}")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Must be set before proxy_pool reads its settings
+    os.environ["STORAGE_BACKEND"] = args.backend
+    os.environ["ROLE"] = "api"
+    from proxy_pool.utils.logger import logger
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    commit = _git("rev-parse", "--short", "HEAD")
+    report = {
+        "commit": commit,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+    }
+    report.update(asyncio.run(run(args)))
+
+    output = args.output
+    if not output:
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = ROOT / "benchmarks" / "results" / f"{stamp}-{commit or 'unknown'}.json"
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(_summary(report))
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
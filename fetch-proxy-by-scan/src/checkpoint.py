@@ -0,0 +1,46 @@
+"""
+Function: Scan Checkpoint
+Business Problem: 记录流式扫描已完成的输入位置，中断后可从断点继续，避免丢失已扫描的进度。
+"""
+
+import json
+import os
+from typing import Set
+
+class Checkpoint:
+    """
+    Low-water mark of the input: every candidate before `done` has been
+    scanned and its result written. Candidates finish out of order, so the
+    ones completed past the mark wait in `pending` until the gap closes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done = 0
+        self.pending: Set[int] = set()
+
+    def load(self) -> int:
+        """Read the saved mark, if any, and return it."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.done = json.load(f)["done"]
+        except FileNotFoundError:
+            self.done = 0
+        return self.done
+
+    def complete(self, index: int):
+        self.pending.add(index)
+        while self.done in self.pending:
+            self.pending.remove(self.done)
+            self.done += 1
+
+    def save(self):
+        # Write then rename, so an interrupt never leaves a torn file
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"done": self.done}, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,52 @@
+"""
+Function: Dead Candidate Filter
+Business Problem: 记住近期验证失败的代理，在冷却期内跳过它们，避免反复探测已知失效的地址。
+"""
+
+import time
+from typing import Iterable, List
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # Optional: install with `uv sync --extra redis`
+    aioredis = None
+
+class Graveyard:
+    """
+    TTL'd set of recently failed "ip:port" candidates, kept in a Redis sorted
+    set scored by the time each may be probed again. It defaults to the key
+    proxy_pool uses, so proxies the pool dropped are skipped here too and the
+    other way around.
+    """
+    BATCH_SIZE = 1000
+
+    def __init__(self, url: str, cooldown: float = 86400, key: str = "proxies:graveyard"):
+        if aioredis is None:
+            raise RuntimeError("The graveyard needs the redis package: uv sync --extra redis")
+        self.redis = aioredis.from_url(url, decode_responses=True)
+        self.cooldown = cooldown
+        self.key = key
+
+    @staticmethod
+    def _member(proxy_url: str) -> str:
+        return proxy_url.split("://")[-1]
+
+    async def filter(self, proxies: List[str]) -> List[str]:
+        """Return the candidates that are not buried, in order."""
+        now = time.time()
+        alive = []
+        for i in range(0, len(proxies), self.BATCH_SIZE):
+            batch = proxies[i:i + self.BATCH_SIZE]
+            until = await self.redis.zmscore(self.key, [self._member(p) for p in batch])
+            alive.extend(p for p, t in zip(batch, until) if t is None or t <= now)
+        return alive
+
+    async def bury(self, proxies: Iterable[str]):
+        """Skip these candidates until the cool-down has passed."""
+        until = time.time() + self.cooldown
+        members = {self._member(p): until for p in proxies}
+        if members:
+            await self.redis.zadd(self.key, members, gt=True)
+
+    async def close(self):
+        await self.redis.aclose()
@@ -1,72 +1,120 @@
- """
- Function: Proxy Scanner CLI Application
- Business Problem: 提供命令行接口，允许用户指定代理列表文件和目标URL，执行大规模并发代理验证并输出可用结果。
- """
- 
- import asyncio
- import argparse
- import sys
- from typing import List
- from scanner import ProxyScanner
- from sources import ProxyFetcher
- 
- def load_proxies(file_path: str) -> List[str]:
-     """Load proxies from a file"""
-     try:
-         with open(file_path, 'r', encoding='utf-8') as f:
-             lines = [line.strip() for line in f if line.strip()]
-         return lines
-     except FileNotFoundError:
-         print(f"[!] Error: File not found: {file_path}")
-         sys.exit(1)
- 
- async def main():
-     parser = argparse.ArgumentParser(description="High Performance Async Proxy Scanner")
-     parser.add_argument("-f", "--file", type=str, help="Path to proxy list file (one per line)")
-     parser.add_argument("--fetch", action="store_true", help="Fetch proxies from public sources")
-     parser.add_argument("-t", "--target", type=str, default="http://httpbin.org/ip", help="Target URL to verify against")
-     parser.add_argument("-o", "--output", type=str, default="active_proxies.txt", help="Output file for active proxies")
-     parser.add_argument("-l", "--limit", type=int, default=100, help="Concurrency limit (default: 100)")
-     
-     args = parser.parse_args()
- 
-     proxies = []
-     
-     if args.fetch:
-         print("[*] Fetching public proxies...")
-         fetched = await ProxyFetcher.fetch_all()
-         print(f"[*] Fetched {len(fetched)} unique proxies.")
-         proxies.extend(fetched)
- 
-     if args.file:
-         file_proxies = load_proxies(args.file)
-         print(f"[*] Loaded {len(file_proxies)} proxies from {args.file}")
-         proxies.extend(file_proxies)
- 
-     if not proxies:
-         print("[!] No proxies provided. Use -f to specify a file or --fetch to get from internet.")
-         sys.exit(1)
-     
-     # Remove duplicates from combined sources
-     proxies = list(set(proxies))
-     print(f"[*] Total unique proxies to scan: {len(proxies)}")
-     
-     scanner = ProxyScanner(target_url=args.target, limit=args.limit)
-     results = await scanner.run(proxies)
-     
-     # Save results
-     if results:
-         with open(args.output, 'w', encoding='utf-8') as f:
-             for r in results:
-                 # Format: protocol://url,latency
-                 line = f"{r.protocol}://{r.url.replace('http://','').replace('https://','').replace('socks5://','')},{r.latency_ms:.2f}ms"
-                 f.write(line + "\n")
-         print(f"[+] Saved {len(results)} active proxies to {args.output}")
-     else:
-         print("[-] No active proxies found.")
- 
- if __name__ == "__main__":
-     try:
-         asyncio.run(main())
-     except KeyboardInterrupt:
-         print("\n[!] Scan interrupted by user.")
+"""
+Function: Proxy Scanner CLI Application
+Business Problem: 提供命令行接口，允许用户指定代理列表文件和目标URL，执行大规模并发代理验证并输出可用结果。
+"""
+
+import asyncio
+import argparse
+import os
+import sys
+from typing import AsyncIterator, Iterator, Optional
+from checkpoint import Checkpoint
+from graveyard import Graveyard
+from parsing import Deduper
+from scanner import ProxyScanner
+from shards import ShardedScanner
+from sources import ProxyFetcher
+from targets import TargetSpace, parse_networks, parse_ports
+
+def iter_proxies(file_path: str) -> Iterator[str]:
+    """Lazily read proxies from a file, one per line"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+async def iter_candidates(args, targets: Optional[TargetSpace] = None) -> AsyncIterator[str]:
+    """
+    All candidates in input order: fetched sources first, then the file, then
+    the generated CIDR targets. Listed inputs are deduplicated; generated
+    targets are unique by construction, so they skip the (memory hungry) set.
+    """
+    deduper = Deduper()
+    if args.fetch:
+        print("[*] Fetching public proxies...")
+        async for proxy in ProxyFetcher.stream_all():
+            if deduper.add_candidate(proxy):
+                yield proxy
+    if args.file:
+        for proxy in iter_proxies(args.file):
+            if deduper.add_candidate(proxy):
+                yield proxy
+    if targets is not None:
+        for proxy in targets.iter(shuffle=not args.sequential, seed=args.seed):
+            yield proxy
+
+async def main():
+    parser = argparse.ArgumentParser(description="High Performance Async Proxy Scanner")
+    parser.add_argument("-f", "--file", type=str, help="Path to proxy list file (one per line)")
+    parser.add_argument("--fetch", action="store_true", help="Fetch proxies from public sources")
+    parser.add_argument("-t", "--target", type=str, default="http://httpbin.org/ip", help="Target URL to verify against")
+    parser.add_argument("-o", "--output", type=str, default="active_proxies.txt", help="Output file for active proxies")
+    parser.add_argument("-l", "--limit", type=int, default=100, help="Concurrency limit (default: 100)")
+    parser.add_argument("--graveyard", type=str, help="Redis URL of the dead-candidate set shared with proxy_pool")
+    parser.add_argument("--cooldown", type=float, default=86400, help="Seconds to skip a failed candidate (default: 86400)")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted scan from its checkpoint")
+    parser.add_argument("--cidr", action="append", default=[], help="IPv4 range(s) to scan, e.g. 47.96.0.0/12 (repeatable, comma-separated)")
+    parser.add_argument("--ports", type=str, default="80,8080,3128,1080", help="Ports to try on every --cidr address, e.g. 80,8000-8100")
+    parser.add_argument("--exclude", action="append", default=[], help="IPv4 range(s) to leave out of --cidr (repeatable, comma-separated)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the --cidr scan order; keep it when resuming (default: 0)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Processes to probe in; -l is shared between them (default: 1)")
+    parser.add_argument("--sequential", action="store_true", help="Scan --cidr targets in address order instead of shuffled")
+    
+    args = parser.parse_args()
+
+    if not args.fetch and not args.file and not args.cidr:
+        print("[!] No proxies provided. Use -f to specify a file, --fetch to get from internet or --cidr to scan a range.")
+        sys.exit(1)
+    if args.resume and args.fetch:
+        # Resuming skips by position, and the public lists change between runs
+        print("[!] Error: --resume can't be combined with --fetch; the fetched lists differ from run to run.")
+        sys.exit(1)
+    if args.file and not os.path.isfile(args.file):
+        print(f"[!] Error: File not found: {args.file}")
+        sys.exit(1)
+
+    targets = None
+    if args.cidr:
+        try:
+            targets = TargetSpace(parse_networks(args.cidr), parse_ports(args.ports), parse_networks(args.exclude))
+        except ValueError as e:
+            print(f"[!] Error: {e}")
+            sys.exit(1)
+        print(f"[*] {len(targets)} targets in {targets.addresses} addresses x {len(targets.ports)} ports.")
+
+    # Progress lives next to the output; resuming appends to both
+    checkpoint = Checkpoint(f"{args.output}.checkpoint")
+    if args.resume:
+        if checkpoint.load():
+            print(f"[*] Resuming after {checkpoint.done} candidates.")
+    else:
+        checkpoint.clear()
+
+    graveyard = Graveyard(args.graveyard, cooldown=args.cooldown) if args.graveyard else None
+    if args.workers > 1:
+        scanner = ShardedScanner(target_url=args.target, limit=args.limit, graveyard=graveyard, workers=args.workers)
+    else:
+        scanner = ProxyScanner(target_url=args.target, limit=args.limit, graveyard=graveyard)
+    try:
+        with open(args.output, 'a' if args.resume else 'w', encoding='utf-8') as output:
+            found = await scanner.run_stream(iter_candidates(args, targets), output, checkpoint)
+    except RuntimeError as e:
+        print(f"[!] Scan aborted: {e}. Run again with --resume to continue.")
+        sys.exit(1)
+    finally:
+        if graveyard:
+            await graveyard.close()
+
+    # Finished: nothing left to resume
+    checkpoint.clear()
+    if found:
+        print(f"[+] Saved {found} active proxies to {args.output}")
+    else:
+        print("[-] No active proxies found.")
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n[!] Scan interrupted by user. Run again with --resume to continue.")
@@ -1,103 +1,288 @@
- """
- Function: Proxy Scanner Core
- Business Problem: 快速扫描互联网上的代理服务器，验证其可用性、延迟及匿名性，为爬虫系统提供稳定的代理资源池。
- """
- 
- import asyncio
- import httpx
- import time
- from typing import List, Dict, Optional, Any
- from dataclasses import dataclass
- 
- @dataclass
- class ProxyResult:
-     url: str
-     is_active: bool
-     latency_ms: float
-     protocol: Optional[str] = None
-     error: Optional[str] = None
-     status_code: Optional[int] = None
-     server_header: Optional[str] = None
- 
- class ProxyScanner:
-     def __init__(self, target_url: str = "http://httpbin.org/ip", limit: int = 100, timeout: float = 5.0):
-         self.target_url = target_url
-         self.semaphore = asyncio.Semaphore(limit)
-         self.timeout = timeout
-         self.results: List[ProxyResult] = []
- 
-     async def _probe_protocol(self, proxy_address: str, protocol_label: str) -> Optional[ProxyResult]:
-         """Helper to probe a specific protocol."""
-         start_time = time.time()
-         try:
-             proxies = {
-                 "http://": proxy_address,
-                 "https://": proxy_address,
-             }
-             
-             async with httpx.AsyncClient(proxies=proxies, timeout=self.timeout, follow_redirects=True) as client:
-                 resp = await client.get(self.target_url)
-                 latency = (time.time() - start_time) * 1000
-                 
-                 if resp.status_code < 400:
-                     return ProxyResult(
-                         url=proxy_address,
-                         is_active=True,
-                         latency_ms=latency,
-                         protocol=protocol_label,
-                         status_code=resp.status_code,
-                         server_header=resp.headers.get("Server")
-                     )
-         except Exception:
-             pass
-         return None
- 
-     async def check_proxy(self, proxy_url: str) -> ProxyResult:
-         """
-         验证单个代理服务器的可用性，支持协议自动探测。
-         """
-         async with self.semaphore:
-             # If scheme is explicitly provided, test only that.
-             if "://" in proxy_url:
-                 scheme = proxy_url.split("://")[0]
-                 result = await self._probe_protocol(proxy_url, scheme)
-                 if result:
-                     self.results.append(result)
-                     return result
-                 else:
-                     return ProxyResult(url=proxy_url, is_active=False, latency_ms=0, error="Connection failed")
- 
-             # Heuristic: Probe protocols based on common ports + fallbacks
-             port = proxy_url.split(":")[-1] if ":" in proxy_url else ""
-             protocols_to_try = []
- 
-             if port == "1080":
-                 protocols_to_try = [("socks5://", "socks5"), ("http://", "http")]
-             else:
-                 protocols_to_try = [("http://", "http"), ("socks5://", "socks5")]
- 
-             for prefix, label in protocols_to_try:
-                 target_proxy = f"{prefix}{proxy_url}"
-                 result = await self._probe_protocol(target_proxy, label)
-                 if result:
-                     self.results.append(result)
-                     return result
-             
-             # If all failed
-             return ProxyResult(url=proxy_url, is_active=False, latency_ms=0, error="All protocols failed")
- 
-     async def run(self, proxy_list: List[str]) -> List[ProxyResult]:
-         """
-         批量执行代理扫描
-         """
-         print(f"[*] Starting proxy scan for {len(proxy_list)} candidates...")
-         print(f"[*] Target: {self.target_url} | Concurrency: {self.semaphore._value}")
-         
-         tasks = [self.check_proxy(p) for p in proxy_list]
-         # Use asyncio.gather to run all tasks
-         # In a real heavy scan, might want to stream results or use as_completed
-         results = await asyncio.gather(*tasks)
-         
-         active_count = sum(1 for r in results if r.is_active)
-         print(f"[+] Scan completed. Found {active_count} active proxies.")
-         return [r for r in results if r.is_active]
+"""
+Function: Proxy Scanner Core
+Business Problem: 快速扫描互联网上的代理服务器，验证其可用性、延迟及匿名性，为爬虫系统提供稳定的代理资源池。
+"""
+
+import asyncio
+import ssl
+import time
+from typing import AsyncIterator, List, Dict, Optional, Any, TextIO, Tuple
+from urllib.parse import urlsplit
+from dataclasses import dataclass
+from checkpoint import Checkpoint
+from graveyard import Graveyard
+
+@dataclass
+class ProxyResult:
+    url: str
+    is_active: bool
+    latency_ms: float
+    protocol: Optional[str] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+    server_header: Optional[str] = None
+
+    def format(self) -> str:
+        """Output line: protocol://host:port,latency"""
+        address = self.url.split("://")[-1]
+        return f"{self.protocol}://{address},{self.latency_ms:.2f}ms"
+
+class WrongProtocol(Exception):
+    """The proxy answered a handshake in another protocol (`actual`, if recognised)."""
+
+    def __init__(self, actual: Optional[str]):
+        super().__init__(f"Proxy speaks {actual or 'an unknown protocol'}")
+        self.actual = actual
+
+class ProxyScanner:
+    BATCH_SIZE = 1000  # Candidates checked against the graveyard at once
+    CHECKPOINT_INTERVAL = 1.0  # Seconds between checkpoint saves in streaming mode
+
+    def __init__(self, target_url: str = "http://httpbin.org/ip", limit: int = 100, timeout: float = 5.0,
+                 graveyard: Optional[Graveyard] = None):
+        self.target_url = target_url
+        self.semaphore = asyncio.Semaphore(limit)
+        self.timeout = timeout
+        self.limit = limit
+        self.graveyard = graveyard
+        self.results: List[ProxyResult] = []
+        target = urlsplit(target_url)
+        self._target_host = target.hostname
+        self._target_port = target.port or (443 if target.scheme == "https" else 80)
+        self._target_path = (target.path or "/") + (f"?{target.query}" if target.query else "")
+        self._ssl = ssl.create_default_context() if target.scheme == "https" else None
+
+    def _parse_head(self, head: bytes) -> Tuple[int, Dict[str, str]]:
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split()[1])
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if value:
+                headers[name.strip().lower()] = value.strip()
+        return status, headers
+
+    def _get_request(self, absolute: bool) -> bytes:
+        # Absolute-form URI for a forward proxy, origin-form inside a tunnel
+        uri = self.target_url if absolute else self._target_path
+        return (
+            f"GET {uri} HTTP/1.1\r\nHost: {self._target_host}\r\n"
+            f"User-Agent: Mozilla/5.0\r\nConnection: close\r\n\r\n"
+        ).encode()
+
+    async def _tunnel_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Tuple[int, Dict[str, str]]:
+        """Request the target through an established tunnel, over TLS for https targets."""
+        if self._ssl:
+            await writer.start_tls(self._ssl, server_hostname=self._target_host)
+        writer.write(self._get_request(absolute=False))
+        await writer.drain()
+        return self._parse_head(await reader.readuntil(b"\r\n\r\n"))
+
+    async def _speak(self, protocol: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Tuple[int, Dict[str, str]]:
+        """
+        Run one protocol over an open connection and return the target's
+        response status and headers. The first reply byte tells the two
+        protocols apart ("H" for HTTP, 0x05 for SOCKS5); WrongProtocol is
+        raised when the proxy answers in the other one.
+        """
+        if protocol == "socks5":
+            writer.write(b"\x05\x01\x00")  # Version 5, one method: no auth
+            await writer.drain()
+            first = await reader.readexactly(1)
+            if first != b"\x05":
+                raise WrongProtocol("http" if first == b"H" else None)
+            if await reader.readexactly(1) != b"\x00":
+                raise ConnectionError("SOCKS5 requires authentication")
+            host = self._target_host.encode()
+            writer.write(b"\x05\x01\x00\x03" + bytes([len(host)]) + host + self._target_port.to_bytes(2, "big"))
+            await writer.drain()
+            reply = await reader.readexactly(4)
+            if reply[1] != 0:
+                raise ConnectionError(f"SOCKS5 connect failed with code {reply[1]}")
+            # Skip the bound address: IPv4, IPv6 or length-prefixed domain, then the port
+            size = {1: 4, 4: 16}.get(reply[3]) or (await reader.readexactly(1))[0]
+            await reader.readexactly(size + 2)
+            return await self._tunnel_request(reader, writer)
+
+        if self._ssl:
+            authority = f"{self._target_host}:{self._target_port}"
+            writer.write(f"CONNECT {authority} HTTP/1.1\r\nHost: {authority}\r\n\r\n".encode())
+        else:
+            writer.write(self._get_request(absolute=True))
+        await writer.drain()
+        first = await reader.readexactly(1)
+        if first != b"H":
+            raise WrongProtocol("socks5" if first == b"\x05" else None)
+        status, headers = self._parse_head(first + await reader.readuntil(b"\r\n\r\n"))
+        if not self._ssl:
+            return status, headers
+        if status != 200:
+            raise ConnectionError(f"CONNECT refused with HTTP {status}")
+        return await self._tunnel_request(reader, writer)
+
+    async def _probe(self, proxy_url: str, host: str, port: int, protocols: List[str]) -> ProxyResult:
+        """
+        Try protocols in order, one connection each. A host that refuses the
+        TCP connect is dropped right away, costing at most one connect
+        timeout; a reply in the other protocol jumps straight to it.
+        """
+        start = time.perf_counter()
+        tried: List[str] = []
+        error = "All protocols failed"
+        while protocols:
+            protocol = protocols.pop(0)
+            tried.append(protocol)
+            writer = None
+            try:
+                async with asyncio.timeout(self.timeout):
+                    reader, writer = await asyncio.open_connection(host, port)
+                    status, headers = await self._speak(protocol, reader, writer)
+                # Redirects come from captive portals and plain web servers, not working proxies
+                if not 200 <= status < 300:
+                    return ProxyResult(url=proxy_url, is_active=False, latency_ms=0, error=f"HTTP {status}")
+                return ProxyResult(
+                    url=f"{protocol}://{host}:{port}",
+                    is_active=True,
+                    latency_ms=(time.perf_counter() - start) * 1000,
+                    protocol=protocol,
+                    status_code=status,
+                    server_header=headers.get("server")
+                )
+            except WrongProtocol as e:
+                if e.actual and e.actual not in tried:
+                    protocols = [e.actual]
+            except Exception as e:
+                if writer is None:
+                    return ProxyResult(url=proxy_url, is_active=False, latency_ms=0, error="Connection failed")
+                error = str(e) or type(e).__name__
+            finally:
+                if writer:
+                    writer.close()
+        return ProxyResult(url=proxy_url, is_active=False, latency_ms=0, error=error)
+
+    async def check_proxy(self, proxy_url: str) -> ProxyResult:
+        """
+        验证单个代理服务器的可用性，支持协议自动探测。
+        """
+        async with self.semaphore:
+            scheme, _, address = proxy_url.rpartition("://")
+            host, _, port = address.rpartition(":")
+            if not port.isdigit():
+                return ProxyResult(url=proxy_url, is_active=False, latency_ms=0, error="Invalid address")
+
+            # If scheme is explicitly provided, test only that.
+            if scheme:
+                protocols = ["socks5"] if scheme.startswith("socks") else ["http"]
+            # Heuristic: Probe protocols based on common ports + fallbacks
+            elif port == "1080":
+                protocols = ["socks5", "http"]
+            else:
+                protocols = ["http", "socks5"]
+            return await self._probe(proxy_url, host, int(port), protocols)
+
+    async def run(self, proxy_list: List[str]) -> List[ProxyResult]:
+        """
+        批量执行代理扫描
+        """
+        if self.graveyard:
+            alive = await self.graveyard.filter(proxy_list)
+            print(f"[*] Skipping {len(proxy_list) - len(alive)} candidates that failed recently.")
+            proxy_list = alive
+
+        print(f"[*] Starting proxy scan for {len(proxy_list)} candidates...")
+        print(f"[*] Target: {self.target_url} | Concurrency: {self.semaphore._value}")
+        
+        tasks = [self.check_proxy(p) for p in proxy_list]
+        # Use asyncio.gather to run all tasks
+        # In a real heavy scan, might want to stream results or use as_completed
+        results = await asyncio.gather(*tasks)
+
+        if self.graveyard:
+            await self.graveyard.bury(r.url for r in results if not r.is_active)
+        
+        self.results = [r for r in results if r.is_active]
+        print(f"[+] Scan completed. Found {len(self.results)} active proxies.")
+        return self.results
+
+    async def _produce(self, candidates: AsyncIterator[str], queue: asyncio.Queue, checkpoint: Checkpoint):
+        """Feed not recently dead candidates past the checkpoint to the workers."""
+        batch = []
+
+        async def enqueue():
+            alive = [c for _, c in batch]
+            if self.graveyard:
+                alive = set(await self.graveyard.filter(alive))
+            for index, candidate in batch:
+                if candidate in alive:
+                    await queue.put((index, candidate))
+                else:
+                    checkpoint.complete(index)
+            batch.clear()
+
+        index = 0
+        async for candidate in candidates:
+            if index >= checkpoint.done:
+                batch.append((index, candidate))
+                if len(batch) >= self.BATCH_SIZE:
+                    await enqueue()
+            index += 1
+        await enqueue()
+
+    async def run_stream(self, candidates: AsyncIterator[str], output: TextIO, checkpoint: Checkpoint) -> int:
+        """
+        流式扫描：惰性读取候选，固定数量的 worker 消费有界队列，
+        结果完成即写入 output，并定期保存断点。返回本次找到的可用代理数。
+        """
+        print(f"[*] Starting streaming scan from candidate #{checkpoint.done}...")
+        print(f"[*] Target: {self.target_url} | Concurrency: {self.limit}")
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.limit * 2)
+        dead: List[str] = []
+        found = 0
+
+        async def work():
+            nonlocal found
+            while (item := await queue.get()) is not None:
+                index, candidate = item
+                result = await self.check_proxy(candidate)
+                if result.is_active:
+                    output.write(result.format() + "\n")
+                    found += 1
+                else:
+                    dead.append(candidate)
+                checkpoint.complete(index)
+
+        async def save():
+            # Results and failures must be durable before the mark moves past them
+            output.flush()
+            if self.graveyard and dead:
+                buried = dead[:]
+                dead.clear()
+                await self.graveyard.bury(buried)
+            checkpoint.save()
+
+        async def save_periodically():
+            while True:
+                await asyncio.sleep(self.CHECKPOINT_INTERVAL)
+                await save()
+
+        async def produce():
+            await self._produce(candidates, queue, checkpoint)
+            for _ in range(self.limit):
+                await queue.put(None)
+
+        # Producer and workers run side by side: if a check raises, the scan
+        # stops there instead of the producer blocking forever on a full queue
+        tasks = [asyncio.create_task(produce())] + [asyncio.create_task(work()) for _ in range(self.limit)]
+        saver = asyncio.create_task(save_periodically())
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+        finally:
+            saver.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(saver, *tasks, return_exceptions=True)
+            await save()
+        print(f"[+] Scan completed. Found {found} active proxies.")
+        return found
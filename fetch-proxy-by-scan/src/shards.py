@@ -0,0 +1,163 @@
+"""
+Function: Multi-Process Probe Pool
+Business Problem: 单个事件循环在数千并发探测时会被 TLS 与解析的 CPU 开销压满一个核，将探测分片到多个进程各自的事件循环中，让扫描吞吐随核数扩展。
+"""
+
+import asyncio
+import multiprocessing
+import queue
+import signal
+from typing import Dict, List, Optional, Set, Tuple
+from graveyard import Graveyard
+from scanner import ProxyResult, ProxyScanner
+
+def _serve(target_url: str, limit: int, timeout: float, inbox, outbox):
+    """Child process entry: probe batches from inbox, report results to outbox."""
+    # Ctrl-C reaches the whole process group; the parent decides when to stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_serve_async(ProxyScanner(target_url, limit=limit, timeout=timeout), inbox, outbox))
+
+async def _serve_async(scanner: ProxyScanner, inbox, outbox):
+    loop = asyncio.get_running_loop()
+    results: List[Tuple[int, ProxyResult]] = []
+    tasks = set()
+
+    async def check(job: int, candidate: str):
+        results.append((job, await scanner.check_proxy(candidate)))
+
+    async def report():
+        while True:
+            await asyncio.sleep(ShardedScanner.FLUSH_INTERVAL)
+            if results:
+                outbox.put(results[:])
+                results.clear()
+
+    reporter = asyncio.create_task(report())
+    while (batch := await loop.run_in_executor(None, inbox.get)) is not None:
+        for job, candidate in batch:
+            task = asyncio.create_task(check(job, candidate))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+    reporter.cancel()
+    outbox.put(results)
+    outbox.put(None)
+
+class ShardedScanner(ProxyScanner):
+    """
+    ProxyScanner whose probes run in `workers` child processes, each with its
+    own event loop. The parent keeps the single candidate stream, checkpoint,
+    graveyard and output, so results merge in one place and --resume works
+    with any worker count; it only ships candidates out and results back, in
+    batches, which costs far less CPU than the probes themselves.
+    """
+    FLUSH_INTERVAL = 0.01  # Seconds a batch may wait before it is sent either way
+
+    def __init__(self, target_url: str = "http://httpbin.org/ip", limit: int = 100, timeout: float = 5.0,
+                 graveyard: Optional[Graveyard] = None, workers: int = 2):
+        super().__init__(target_url, limit=limit, timeout=timeout, graveyard=graveyard)
+        self.workers = workers
+        self._context = multiprocessing.get_context("spawn")
+        self._processes = []
+        self._inboxes = []
+        self._outbox = None
+        self._buffers: List[List[Tuple[int, str]]] = []
+        self._futures: Dict[int, asyncio.Future] = {}
+        self._owners: Dict[int, int] = {}  # job -> worker it was sent to
+        self._dead: Set[int] = set()  # Workers that exited, never sent to again
+        self._next_job = 0
+        self._tasks = []
+
+    async def start(self):
+        self._outbox = self._context.Queue()
+        self._inboxes = [self._context.Queue() for _ in range(self.workers)]
+        self._buffers = [[] for _ in range(self.workers)]
+        self._dead.clear()
+        self._processes = [
+            self._context.Process(target=_serve, args=(self.target_url, self.limit, self.timeout, inbox, self._outbox), daemon=True)
+            for inbox in self._inboxes
+        ]
+        for process in self._processes:
+            process.start()
+        self._tasks = [asyncio.create_task(self._dispatch()), asyncio.create_task(self._collect())]
+
+    async def close(self):
+        """Let the workers drain and exit; kill them if the scan was aborted."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for inbox in self._inboxes:
+            inbox.put(None)
+        loop = asyncio.get_running_loop()
+        for process in self._processes:
+            if self._futures:
+                process.terminate()
+            await loop.run_in_executor(None, process.join)
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._owners.clear()
+
+    async def _dispatch(self):
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+            for inbox, buffer in zip(self._inboxes, self._buffers):
+                if buffer:
+                    inbox.put(buffer[:])
+                    buffer.clear()
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                batch = await loop.run_in_executor(None, self._outbox.get, True, 1.0)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            for job, result in batch or ():
+                self._owners.pop(job, None)
+                future = self._futures.pop(job, None)
+                if future and not future.done():
+                    future.set_result(result)
+            self._check_workers()
+
+    def _check_workers(self):
+        """Fail the jobs of a worker that died, rather than waiting on them forever."""
+        for worker, process in enumerate(self._processes):
+            if worker in self._dead or process.is_alive():
+                continue
+            self._dead.add(worker)
+            self._buffers[worker].clear()
+            for job in [j for j, w in self._owners.items() if w == worker]:
+                del self._owners[job]
+                future = self._futures.pop(job)
+                if not future.done():
+                    future.set_exception(RuntimeError(f"Scan worker {worker} exited with code {process.exitcode}"))
+
+    async def check_proxy(self, proxy_url: str) -> ProxyResult:
+        alive = [w for w in range(self.workers) if w not in self._dead]
+        if not alive:
+            raise RuntimeError("Every scan worker has exited")
+        job = self._next_job
+        self._next_job += 1
+        worker = alive[job % len(alive)]
+        future = asyncio.get_running_loop().create_future()
+        self._futures[job] = future
+        self._owners[job] = worker
+        self._buffers[worker].append((job, proxy_url))
+        return await future
+
+    async def run(self, proxy_list: List[str]) -> List[ProxyResult]:
+        await self.start()
+        try:
+            return await super().run(proxy_list)
+        finally:
+            await self.close()
+
+    async def run_stream(self, candidates, output, checkpoint) -> int:
+        print(f"[*] Probing in {self.workers} worker processes.")
+        await self.start()
+        try:
+            return await super().run_stream(candidates, output, checkpoint)
+        finally:
+            await self.close()
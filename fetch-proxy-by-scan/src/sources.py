@@ -1,40 +1,70 @@
- """
- Function: Proxy Source Fetcher
- Business Problem: 从公开的互联网源自动获取代理服务器列表，作为验证引擎的输入源。
- """
- 
- import httpx
- import re
- from typing import List, Set
- 
- class ProxyFetcher:
-     # Public proxy list sources (Text format preferred for simplicity)
-     SOURCES = [
-         "https://raw.githubusercontent.com/TheSpeedX/SOCKS-List/master/http.txt",
-         "https://raw.githubusercontent.com/monosans/proxy-list/main/proxies/http.txt",
-         # "https://www.sslproxies.org/", # Requires HTML parsing, skipping for simplicity unless needed
-     ]
- 
-     @staticmethod
-     async def fetch_all() -> List[str]:
-         """
-         Fetch unique proxies from all defined sources.
-         """
-         proxies: Set[str] = set()
-         
-         async with httpx.AsyncClient(timeout=10.0) as client:
-             for url in ProxyFetcher.SOURCES:
-                 try:
-                     print(f"[*] Fetching from {url}...")
-                     resp = await client.get(url)
-                     if resp.status_code == 200:
-                         # Extract ip:port pattern
-                         found = re.findall(r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}:\d+", resp.text)
-                         print(f"    -> Found {len(found)} proxies.")
-                         proxies.update(found)
-                     else:
-                         print(f"    -> Failed with status {resp.status_code}")
-                 except Exception as e:
-                     print(f"    -> Error: {str(e)}")
-         
-         return list(proxies)
+"""
+Function: Proxy Source Fetcher
+Business Problem: 从公开的互联网源自动获取代理服务器列表，作为验证引擎的输入源。
+"""
+
+import tempfile
+import httpx
+from typing import AsyncIterator, BinaryIO, List
+from parsing import Deduper, parse_stream
+
+class ProxyFetcher:
+    # Public proxy list sources (Text format preferred for simplicity)
+    SOURCES = [
+        "https://raw.githubusercontent.com/TheSpeedX/SOCKS-List/master/http.txt",
+        "https://raw.githubusercontent.com/monosans/proxy-list/main/proxies/http.txt",
+        # "https://www.sslproxies.org/", # Requires HTML parsing, skipping for simplicity unless needed
+    ]
+    CHUNK_SIZE = 65536
+
+    @staticmethod
+    async def _download(client: httpx.AsyncClient, url: str, spool: BinaryIO) -> bool:
+        """Write the whole body of `url` to `spool`; False if the source failed."""
+        async with client.stream("GET", url) as resp:
+            if resp.status_code != 200:
+                print(f"    -> Failed with status {resp.status_code}")
+                return False
+            async for chunk in resp.aiter_bytes(ProxyFetcher.CHUNK_SIZE):
+                spool.write(chunk)
+        spool.seek(0)
+        return True
+
+    @staticmethod
+    async def _read(spool: BinaryIO) -> AsyncIterator[bytes]:
+        while chunk := spool.read(ProxyFetcher.CHUNK_SIZE):
+            yield chunk
+
+    @staticmethod
+    async def stream_all() -> AsyncIterator[str]:
+        """
+        Stream unique proxies from all defined sources.
+
+        Each list is downloaded to a temporary file before it is parsed: a
+        scan applies backpressure for as long as it runs, and a connection
+        held open that long would be cut by the server, silently truncating
+        the input. A source that fails contributes nothing rather than part
+        of its list.
+        """
+        deduper = Deduper()
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            for url in ProxyFetcher.SOURCES:
+                with tempfile.TemporaryFile() as spool:
+                    try:
+                        print(f"[*] Fetching from {url}...")
+                        if not await ProxyFetcher._download(client, url, spool):
+                            continue
+                    except Exception as e:
+                        print(f"    -> Error: {str(e)}")
+                        continue
+                    found = 0
+                    async for proxy in parse_stream(ProxyFetcher._read(spool), deduper):
+                        found += 1
+                        yield proxy
+                    print(f"    -> Found {found} new proxies.")
+
+    @staticmethod
+    async def fetch_all() -> List[str]:
+        """
+        Fetch unique proxies from all defined sources.
+        """
+        return [proxy async for proxy in ProxyFetcher.stream_all()]
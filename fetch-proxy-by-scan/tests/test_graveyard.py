@@ -0,0 +1,94 @@
+# 墓地测试 - 验证失败代理在冷却期内被跳过，冷却期后重新放行（需要 Redis）
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from graveyard import Graveyard
+
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+TEST_KEY = "proxies:graveyard:test"
+
+
+async def test_bury_and_expire() -> dict:
+    """测试埋葬的代理在冷却期内被拒绝，冷却期过后重新接受"""
+    graveyard = Graveyard(REDIS_URL, cooldown=0.5, key=TEST_KEY)
+    try:
+        await graveyard.redis.delete(TEST_KEY)
+        await graveyard.bury(["http://1.2.3.4:8080"])
+
+        # 同一地址换个协议前缀也应被识别为已埋葬
+        buried = await graveyard.filter(["socks5://1.2.3.4:8080", "5.6.7.8:3128"])
+        await asyncio.sleep(0.6)
+        expired = await graveyard.filter(["socks5://1.2.3.4:8080", "5.6.7.8:3128"])
+
+        if buried == ["5.6.7.8:3128"] and expired == ["socks5://1.2.3.4:8080", "5.6.7.8:3128"]:
+            return {"test": "bury_and_expire", "status": "✓ 通过"}
+        return {"test": "bury_and_expire", "status": "✗ 失败", "error": f"冷却期内: {buried}, 冷却期后: {expired}"}
+    except Exception as e:
+        return {"test": "bury_and_expire", "status": "✗ 失败", "error": str(e)}
+    finally:
+        await graveyard.redis.delete(TEST_KEY)
+        await graveyard.close()
+
+
+async def test_bury_keeps_later_expiry() -> dict:
+    """测试重复埋葬不会缩短已有的冷却期"""
+    long_lived = Graveyard(REDIS_URL, cooldown=60, key=TEST_KEY)
+    short_lived = Graveyard(REDIS_URL, cooldown=0.1, key=TEST_KEY)
+    try:
+        await long_lived.redis.delete(TEST_KEY)
+        await long_lived.bury(["9.9.9.9:80"])
+        await short_lived.bury(["9.9.9.9:80"])
+        await asyncio.sleep(0.2)
+        alive = await short_lived.filter(["9.9.9.9:80"])
+
+        if alive == []:
+            return {"test": "bury_keeps_later_expiry", "status": "✓ 通过"}
+        return {"test": "bury_keeps_later_expiry", "status": "✗ 失败", "error": "冷却期被缩短"}
+    except Exception as e:
+        return {"test": "bury_keeps_later_expiry", "status": "✗ 失败", "error": str(e)}
+    finally:
+        await long_lived.redis.delete(TEST_KEY)
+        await long_lived.close()
+        await short_lived.close()
+
+
+async def run_all_tests() -> None:
+    """运行所有墓地测试"""
+    print("=" * 60)
+    print("开始运行 墓地 测试套件")
+    print("=" * 60)
+
+    tests = [
+        test_bury_and_expire,
+        test_bury_keeps_later_expiry,
+    ]
+
+    results = []
+    for test_func in tests:
+        print(f"\n运行测试: {test_func.__name__}")
+        result = await test_func()
+        results.append(result)
+        print(f"  结果: {result['status']}")
+        if "error" in result:
+            print(f"  错误: {result['error']}")
+
+    print("\n" + "=" * 60)
+    print("测试总结")
+    print("=" * 60)
+
+    passed = sum(1 for r in results if "✓" in r["status"])
+    failed = sum(1 for r in results if "✗" in r["status"])
+
+    print(f"总计: {len(results)} 个测试")
+    print(f"通过: {passed} ✓")
+    print(f"失败: {failed} ✗")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_all_tests())
@@ -0,0 +1,94 @@
+# 扫描器测试 - 验证只有目标返回 2xx 的代理才被判定为可用
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from scanner import ProxyScanner
+
+
+def _stub(status_line: bytes, headers: bytes = b""):
+    """本地假代理：对任何请求返回固定的状态行"""
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(status_line + b"\r\n" + headers + b"Content-Length: 0\r\n\r\n")
+            await writer.drain()
+        except Exception:
+            pass
+        finally:
+            writer.close()
+    return handle
+
+
+async def _check(status_line: bytes, headers: bytes = b""):
+    server = await asyncio.start_server(_stub(status_line, headers), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return await ProxyScanner("http://example.com/", timeout=5).check_proxy(f"http://127.0.0.1:{port}")
+    finally:
+        server.close()
+
+
+async def test_ok_is_active() -> dict:
+    """测试目标返回 200 时代理可用"""
+    try:
+        result = await _check(b"HTTP/1.1 200 OK")
+        if result.is_active and result.protocol == "http":
+            return {"test": "ok_is_active", "status": "✓ 通过"}
+        return {"test": "ok_is_active", "status": "✗ 失败", "error": f"结果异常: {result}"}
+    except Exception as e:
+        return {"test": "ok_is_active", "status": "✗ 失败", "error": str(e)}
+
+
+async def test_redirect_is_rejected() -> dict:
+    """测试返回 3xx 重定向的地址（强制门户、普通网站）不被当作可用代理"""
+    try:
+        results = [
+            await _check(b"HTTP/1.1 302 Found", b"Location: http://portal.local/login\r\n"),
+            await _check(b"HTTP/1.1 301 Moved Permanently", b"Location: https://example.com/\r\n"),
+        ]
+        if all(not r.is_active for r in results):
+            return {"test": "redirect_is_rejected", "status": "✓ 通过"}
+        return {"test": "redirect_is_rejected", "status": "✗ 失败", "error": f"重定向被判定为可用: {results}"}
+    except Exception as e:
+        return {"test": "redirect_is_rejected", "status": "✗ 失败", "error": str(e)}
+
+
+async def run_all_tests() -> None:
+    """运行所有扫描器测试"""
+    print("=" * 60)
+    print("开始运行 扫描器 测试套件")
+    print("=" * 60)
+
+    tests = [
+        test_ok_is_active,
+        test_redirect_is_rejected,
+    ]
+
+    results = []
+    for test_func in tests:
+        print(f"\n运行测试: {test_func.__name__}")
+        result = await test_func()
+        results.append(result)
+        print(f"  结果: {result['status']}")
+        if "error" in result:
+            print(f"  错误: {result['error']}")
+
+    print("\n" + "=" * 60)
+    print("测试总结")
+    print("=" * 60)
+
+    passed = sum(1 for r in results if "✓" in r["status"])
+    failed = sum(1 for r in results if "✗" in r["status"])
+
+    print(f"总计: {len(results)} 个测试")
+    print(f"通过: {passed} ✓")
+    print(f"失败: {failed} ✗")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_all_tests())
@@ -0,0 +1,122 @@
+# 多进程扫描测试 - 验证分片扫描结果完整，且子进程意外退出时扫描及时中止而不是卡死
+import asyncio
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from checkpoint import Checkpoint
+from shards import ShardedScanner
+
+CANDIDATES = 2000
+
+
+async def _stub_proxy(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """本地假代理：稍作延迟后对任何请求返回 200"""
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+        await asyncio.sleep(0.05)
+        writer.write(b"HTTP/1.1 200 OK\r\nServer: stub\r\nContent-Length: 0\r\n\r\n")
+        await writer.drain()
+    except (Exception, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _candidates(port: int):
+    for _ in range(CANDIDATES):
+        yield f"http://127.0.0.1:{port}"
+
+
+async def test_sharded_scan() -> dict:
+    """测试两个子进程扫描完所有候选"""
+    server = await asyncio.start_server(_stub_proxy, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    scanner = ShardedScanner("http://example.com/", limit=50, timeout=5, workers=2)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = Checkpoint(f"{tmp}/scan.checkpoint")
+            found = await asyncio.wait_for(scanner.run_stream(_candidates(port), io.StringIO(), checkpoint), 60)
+
+        if found == CANDIDATES and checkpoint.done == CANDIDATES:
+            return {"test": "sharded_scan", "status": "✓ 通过"}
+        return {"test": "sharded_scan", "status": "✗ 失败", "error": f"found={found}, done={checkpoint.done}"}
+    except Exception as e:
+        return {"test": "sharded_scan", "status": "✗ 失败", "error": repr(e)}
+    finally:
+        server.close()
+
+
+async def test_worker_killed() -> dict:
+    """测试扫描中途杀掉一个子进程后，扫描以错误结束、断点停在已完成处、不留子进程"""
+    server = await asyncio.start_server(_stub_proxy, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    scanner = ShardedScanner("http://example.com/", limit=50, timeout=5, workers=2)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = Checkpoint(f"{tmp}/scan.checkpoint")
+            scan = asyncio.create_task(scanner.run_stream(_candidates(port), io.StringIO(), checkpoint))
+            while checkpoint.done < 200 and not scan.done():
+                await asyncio.sleep(0.01)
+            scanner._processes[0].kill()
+
+            try:
+                await asyncio.wait_for(scan, 30)
+                error = None
+            except RuntimeError as e:
+                error = e
+            except asyncio.TimeoutError:
+                return {"test": "worker_killed", "status": "✗ 失败", "error": "扫描卡死，未能中止"}
+
+        alive = [p for p in scanner._processes if p.is_alive()]
+        if error and 0 < checkpoint.done < CANDIDATES and not alive:
+            return {"test": "worker_killed", "status": "✓ 通过", "done": checkpoint.done}
+        return {
+            "test": "worker_killed", "status": "✗ 失败",
+            "error": f"error={error!r}, done={checkpoint.done}, alive={len(alive)}",
+        }
+    except Exception as e:
+        return {"test": "worker_killed", "status": "✗ 失败", "error": repr(e)}
+    finally:
+        server.close()
+
+
+async def run_all_tests() -> None:
+    """运行所有多进程扫描测试"""
+    print("=" * 60)
+    print("开始运行 多进程扫描 测试套件")
+    print("=" * 60)
+
+    tests = [
+        test_sharded_scan,
+        test_worker_killed,
+    ]
+
+    results = []
+    for test_func in tests:
+        print(f"\n运行测试: {test_func.__name__}")
+        result = await test_func()
+        results.append(result)
+        print(f"  结果: {result['status']}")
+        if "error" in result:
+            print(f"  错误: {result['error']}")
+
+    print("\n" + "=" * 60)
+    print("测试总结")
+    print("=" * 60)
+
+    passed = sum(1 for r in results if "✓" in r["status"])
+    failed = sum(1 for r in results if "✗" in r["status"])
+
+    print(f"总计: {len(results)} 个测试")
+    print(f"通过: {passed} ✓")
+    print(f"失败: {failed} ✗")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_all_tests())
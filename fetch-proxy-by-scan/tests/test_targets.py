@@ -0,0 +1,88 @@
+# 扫描目标测试 - 验证打乱顺序的排列恰好覆盖每个目标一次，且相邻目标被分散开
+import asyncio
+import ipaddress
+import sys
+from pathlib import Path
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from targets import TargetSpace
+
+# 质数、2 的幂与普通合数，覆盖步长与 n 互质的各种情况
+SIZES = [2, 3, 4, 5, 7, 8, 12, 16, 31, 64, 97, 100, 128, 1000, 1024]
+
+
+def _space(n: int) -> TargetSpace:
+    """单个地址 × n 个端口，共 n 个目标"""
+    return TargetSpace([ipaddress.ip_network("10.0.0.1/32")], list(range(1, n + 1)))
+
+
+async def test_permutation_covers_all() -> dict:
+    """测试不同 n 与种子下，打乱顺序恰好访问每个目标一次"""
+    try:
+        for n in SIZES:
+            space = _space(n)
+            expected = sorted(space[i] for i in range(n))
+            for seed in (0, 1, 7):
+                visited = list(space.iter(shuffle=True, seed=seed))
+                if sorted(visited) != expected:
+                    return {"test": "permutation_covers_all", "status": "✗ 失败", "error": f"n={n}, seed={seed} 遗漏或重复"}
+        return {"test": "permutation_covers_all", "status": "✓ 通过"}
+    except Exception as e:
+        return {"test": "permutation_covers_all", "status": "✗ 失败", "error": str(e)}
+
+
+async def test_permutation_spreads_neighbours() -> dict:
+    """测试打乱后连续两个目标在原顺序中不相邻，且顺序可由种子复现"""
+    try:
+        n = 1000
+        space = _space(n)
+        position = {space[i]: i for i in range(n)}
+        for seed in range(20):
+            order = [position[t] for t in space.iter(shuffle=True, seed=seed)]
+            close = sum(1 for x, y in zip(order, order[1:]) if min((x - y) % n, (y - x) % n) < n // 10)
+            if close:
+                return {"test": "permutation_spreads_neighbours", "status": "✗ 失败", "error": f"seed={seed}: {close} 对相邻目标"}
+        if list(space.iter(seed=3)) != list(space.iter(seed=3)):
+            return {"test": "permutation_spreads_neighbours", "status": "✗ 失败", "error": "相同种子顺序不同"}
+        return {"test": "permutation_spreads_neighbours", "status": "✓ 通过"}
+    except Exception as e:
+        return {"test": "permutation_spreads_neighbours", "status": "✗ 失败", "error": str(e)}
+
+
+async def run_all_tests() -> None:
+    """运行所有扫描目标测试"""
+    print("=" * 60)
+    print("开始运行 扫描目标 测试套件")
+    print("=" * 60)
+
+    tests = [
+        test_permutation_covers_all,
+        test_permutation_spreads_neighbours,
+    ]
+
+    results = []
+    for test_func in tests:
+        print(f"\n运行测试: {test_func.__name__}")
+        result = await test_func()
+        results.append(result)
+        print(f"  结果: {result['status']}")
+        if "error" in result:
+            print(f"  错误: {result['error']}")
+
+    print("\n" + "=" * 60)
+    print("测试总结")
+    print("=" * 60)
+
+    passed = sum(1 for r in results if "✓" in r["status"])
+    failed = sum(1 for r in results if "✗" in r["status"])
+
+    print(f"总计: {len(results)} 个测试")
+    print(f"通过: {passed} ✓")
+    print(f"失败: {failed} ✗")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_all_tests())
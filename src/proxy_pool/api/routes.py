@@ -1,34 +1,87 @@
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from proxy_pool.core.cache import cache
 from proxy_pool.core.storage import storage
-from proxy_pool.schemas.proxy import Proxy
+from proxy_pool.schemas.proxy import ProxyRecord
+from proxy_pool.utils import metrics
+from proxy_pool.utils.config import settings
+import json
+import time
+from collections.abc import AsyncIterator
 from typing import Literal
 
 router = APIRouter()
 
 @router.get("/get")
 async def get_proxy(
-    format: Literal["json", "text"] = Query("json", description="Response format")
+    format: Literal["json", "text"] = Query("json", description="Response format"),
+    strategy: Literal["best", "fastest", "weighted"] = Query("best", description="Selection strategy"),
+    count: int | None = Query(
+        None, ge=1, le=settings.API_MAX_COUNT,
+        description="Return up to this many distinct proxies as a list"
+    )
 ):
-    proxy = await storage.get_random()
-    if not proxy:
+    start = time.perf_counter()
+    proxies = None
+    if settings.CACHE_ENABLED and strategy == "best":
+        proxies = await cache.get_many(count or 1)
+    if proxies is None:
+        proxies = await storage.get_many(count or 1, strategy)
+    metrics.GET_SECONDS.labels(strategy).observe(time.perf_counter() - start)
+    if not proxies:
         raise HTTPException(status_code=503, detail={"msg": "Pool is empty, refreshing..."})
-    
+
+    if count is not None:
+        if format == "text":
+            return PlainTextResponse("\n".join(p.string for p in proxies))
+        return [p.to_dict() for p in proxies]
+
+    proxy = proxies[0]
     if format == "text":
         return proxy.string
-    return proxy
+    return proxy.to_dict()
+
+@router.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(await metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 @router.get("/stats")
 async def get_stats():
-    count = await storage.count()
-    proxies = await storage.get_all()
-    high_score_count = sum(1 for p in proxies if p.score >= 100)
-    
-    return {
-        "total": count,
-        "high_score": high_score_count,
-        "status": "healthy" if count > 0 else "empty"
-    }
+    stats = await storage.stats()
+    stats["status"] = "healthy" if stats["total"] > 0 else "empty"
+    return stats
+
+async def _stream_proxies(pages: AsyncIterator[list[ProxyRecord]], limit: int | None, ndjson: bool):
+    """Encode pages as they arrive, either as NDJSON lines or one JSON array."""
+    sent = 0
+    if not ndjson:
+        yield "["
+    async for page in pages:
+        if limit is not None:
+            page = page[:limit - sent]
+        if not page:
+            continue
+        if ndjson:
+            yield "".join(json.dumps(p.to_dict()) + "\n" for p in page)
+        else:
+            yield ("," if sent else "") + ",".join(json.dumps(p.to_dict()) for p in page)
+        sent += len(page)
+        if limit is not None and sent >= limit:
+            break
+    if not ndjson:
+        yield "]"
 
 @router.get("/all")
-async def get_all_proxies():
-    return await storage.get_all()
+async def get_all_proxies(
+    format: Literal["json", "ndjson"] = Query("json", description="Response format"),
+    min_score: int | None = Query(None, description="Only proxies with at least this score"),
+    protocol: str | None = Query(None, description="Only proxies of this protocol"),
+    source: str | None = Query(None, description="Only proxies from this fetcher"),
+    limit: int | None = Query(None, ge=1, description="Return at most this many proxies")
+):
+    pages = storage.scan_pages(min_score=min_score, protocol=protocol, source=source)
+    ndjson = format == "ndjson"
+    return StreamingResponse(
+        _stream_proxies(pages, limit, ndjson),
+        media_type="application/x-ndjson" if ndjson else "application/json"
+    )
@@ -0,0 +1,35 @@
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from proxy_pool.api.routes import router
+from proxy_pool.utils.config import settings
+from proxy_pool.utils.logger import logger
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup logic
+    logger.info("ProxyPool starting...")
+    from proxy_pool.core.storage import storage
+    await storage.start()
+
+    from proxy_pool.core.cache import cache
+    await cache.start()
+
+    # Imported only when needed, so API-only processes never load
+    # aiohttp, APScheduler or the fetchers
+    if settings.ROLE == "all":
+        from proxy_pool import worker
+        await worker.start()
+    elif settings.STORAGE_BACKEND == "memory":
+        logger.warning("ROLE=api with the memory backend: nothing will fetch or validate this pool.")
+
+    yield
+
+    # Shutdown logic
+    logger.info("ProxyPool shutting down...")
+    if settings.ROLE == "all":
+        await worker.stop()
+    await cache.close()
+    await storage.close()
+
+app = FastAPI(title="ProxyPool API", version="0.1.0", lifespan=lifespan)
+app.include_router(router)
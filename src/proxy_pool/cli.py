@@ -0,0 +1,59 @@
+"""Command line entry point: `proxy-pool api` or `proxy-pool worker`.
+
+Both roles import only what they run, so `api` starts without aiohttp,
+APScheduler or the fetchers, and both run on uvloop when it is installed
+(it comes with uvicorn[standard]).
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+from proxy_pool.utils.config import settings
+
+def _has(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def run_api(host: str, port: int, workers: int):
+    import uvicorn
+    # Only serve; uvicorn's worker processes read the role from the environment
+    os.environ["ROLE"] = "api"
+    settings.ROLE = "api"
+    uvicorn.run(
+        "proxy_pool.app:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop="uvloop" if _has("uvloop") else "asyncio",
+        http="httptools" if _has("httptools") else "h11",
+        access_log=settings.API_ACCESS_LOG,
+    )
+
+def run_worker():
+    from proxy_pool import worker
+    loop_factory = None
+    if _has("uvloop"):
+        import uvloop
+        loop_factory = uvloop.new_event_loop
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        try:
+            runner.run(worker.main())
+        except KeyboardInterrupt:
+            pass
+
+def main():
+    parser = argparse.ArgumentParser(prog="proxy-pool", description="Proxy pool API server and background worker")
+    roles = parser.add_subparsers(dest="role", required=True)
+    api = roles.add_parser("api", help="Serve the HTTP API only")
+    api.add_argument("--host", default=settings.API_HOST)
+    api.add_argument("--port", type=int, default=settings.API_PORT)
+    api.add_argument("--workers", type=int, default=settings.API_WORKERS, help="Serving processes")
+    roles.add_parser("worker", help="Fetch and validate proxies")
+    args = parser.parse_args()
+
+    if args.role == "api":
+        run_api(args.host, args.port, args.workers)
+    else:
+        run_worker()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import asyncio
+import random
+import time
+from collections.abc import AsyncIterator
+from proxy_pool.core.sampler import WeightedIndex
+from proxy_pool.schemas.proxy import Proxy, ProxyRecord
+from proxy_pool.utils import metrics
+from proxy_pool.utils.config import settings
+from proxy_pool.utils.logger import logger
+
+class BaseStorage:
+    """Interface shared by the storage backends, chosen with STORAGE_BACKEND.
+
+    - redis (core/storage.py): shared by every process, each call a round trip
+    - memory (core/memory.py): one process only, no I/O, optional snapshots
+
+    Backends implement the abstract methods below; the selection strategies,
+    the fastest/weighted index and the stats layout are shared here.
+    Reads return ProxyRecord copies that callers may modify freely.
+    """
+
+    # Calls timed into proxy_pool_storage_seconds, in every backend
+    _TIMED = (
+        "add", "add_many", "delete", "adjust_score", "record_results",
+        "get_all", "claim_due", "count", "stats", "acquire_lease", "release_lease",
+        "_pick_best", "_load", "_index_inputs",
+    )
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls._TIMED:
+            if name in cls.__dict__:
+                series = metrics.STORAGE_SECONDS.labels(name.lstrip("_"))
+                setattr(cls, name, metrics.timed(series)(cls.__dict__[name]))
+
+    def __init__(self):
+        # In-process index behind the fastest/weighted strategies
+        self._index = WeightedIndex()
+        self._fastest: list[str] = []
+        self._index_at = 0.0
+        self._index_lock = asyncio.Lock()
+        self._index_refreshing: asyncio.Task | None = None
+
+    async def start(self):
+        """Prepare the backend on startup (migrations, loading a snapshot)."""
+
+    async def close(self):
+        """Release connections and persist whatever needs persisting."""
+        if self._index_refreshing:
+            self._index_refreshing.cancel()
+            await asyncio.gather(self._index_refreshing, return_exceptions=True)
+            self._index_refreshing = None
+
+    async def add(self, proxy: Proxy) -> bool:
+        """Add a proxy if it doesn't exist and isn't in the graveyard, otherwise ignore."""
+        raise NotImplementedError
+
+    async def add_many(self, proxies: list[Proxy]) -> int:
+        """Add proxies, ignoring ones already stored or buried.
+
+        Returns the number of proxies that were actually new.
+        """
+        raise NotImplementedError
+
+    async def delete(self, proxy: Proxy | ProxyRecord):
+        """Remove a proxy from the pool and every index."""
+        raise NotImplementedError
+
+    async def adjust_score(self, proxy: ProxyRecord, delta: int, latency: float | None = None) -> int | None:
+        """Atomically apply a score delta, clamped to MAX_SCORE.
+
+        Proxies that reach MIN_SCORE are deleted and buried in the graveyard
+        for GRAVEYARD_TTL seconds, the others get their next check
+        rescheduled. A positive delta also records the success time and
+        folds `latency` (ms) into the latency EWMA. Returns the new score, or
+        None if the proxy was already gone.
+        """
+        raise NotImplementedError
+
+    async def decrease(self, proxy: ProxyRecord):
+        """Decrease score and delete if below minimum."""
+        return await self.adjust_score(proxy, -settings.SCORE_DECREMENT)
+
+    async def increase(self, proxy: ProxyRecord, latency: float | None = None):
+        """Increase score up to maximum."""
+        return await self.adjust_score(proxy, settings.SCORE_INCREMENT, latency)
+
+    async def record_results(self, results: list[tuple[ProxyRecord, float | None]]) -> list[int | None]:
+        """Apply a batch of validation results.
+
+        Each result is the measured latency in ms, or None for a failed
+        check, and is applied like increase/decrease. Subscribers of
+        events() are told scores changed. Returns the new scores in order
+        (None for proxies already gone).
+        """
+        raise NotImplementedError
+
+    async def get_all(self) -> list[ProxyRecord]:
+        raise NotImplementedError
+
+    def scan(self) -> AsyncIterator[ProxyRecord]:
+        """Iterate stored proxies without loading the whole pool.
+
+        Scores may not be hydrated, and a proxy may be yielded more than once.
+        """
+        raise NotImplementedError
+
+    def scan_pages(
+        self,
+        min_score: int | None = None,
+        protocol: str | None = None,
+        source: str | None = None,
+    ) -> AsyncIterator[list[ProxyRecord]]:
+        """Iterate the pool a page at a time, hydrated and filtered.
+
+        Memory stays bounded by SCAN_BATCH_SIZE whatever the pool size. Pages
+        may come back empty after filtering, and a proxy may be yielded more
+        than once.
+        """
+        raise NotImplementedError
+
+    async def claim_due(self, limit: int) -> list[ProxyRecord]:
+        """Claim up to `limit` proxies whose next check is due.
+
+        Claimed proxies are leased for VALIDATE_LEASE seconds; recording their
+        result replaces the lease with the real next-check time.
+        """
+        raise NotImplementedError
+
+    async def count(self) -> int:
+        raise NotImplementedError
+
+    async def stats(self) -> dict:
+        """Pool breakdown by score band, source and protocol."""
+        raise NotImplementedError
+
+    def events(self) -> AsyncIterator[str]:
+        """Yield a message ("added", "scores") whenever the pool changes."""
+        raise NotImplementedError
+
+    async def acquire_lease(self, name: str, holder: str, ttl: float) -> bool:
+        """Take or extend the lease `name` for `ttl` seconds.
+
+        Returns True if `holder` holds it afterwards. Used to elect the one
+        node that runs the fetchers.
+        """
+        raise NotImplementedError
+
+    async def release_lease(self, name: str, holder: str):
+        """Free the lease `name` if `holder` still has it."""
+        raise NotImplementedError
+
+    async def _pick_best(self, count: int) -> list[ProxyRecord]:
+        """The `best` strategy, see get_many."""
+        raise NotImplementedError
+
+    async def _load(self, members: list[str]) -> list[ProxyRecord]:
+        """Records for `members` in order, skipping ones no longer stored."""
+        raise NotImplementedError
+
+    async def _index_inputs(self) -> tuple[dict[str, float], list[tuple[str, float]]]:
+        """Scores by member, and (member, latency) pairs by ascending latency."""
+        raise NotImplementedError
+
+    async def _refresh_index(self):
+        """Keep the in-process index used by the fastest/weighted strategies fresh.
+
+        The index is rebuilt at most every SAMPLER_REFRESH_INTERVAL seconds.
+        Only the first build runs inline; afterwards a stale index keeps
+        serving while a background task rebuilds it, so no request pays for
+        reading the whole pool.
+        """
+        if time.monotonic() - self._index_at < settings.SAMPLER_REFRESH_INTERVAL:
+            return
+        if self._index_at:
+            if not self._index_refreshing or self._index_refreshing.done():
+                self._index_refreshing = asyncio.create_task(self._rebuild_index())
+            return
+        await self._rebuild_index()
+
+    async def _rebuild_index(self):
+        """Resync the index with storage.
+
+        Only proxies that have passed a check (and so have a latency) take
+        part; each is weighted by score / latency, and only weights that
+        changed since the last rebuild touch the index. The fastest list is
+        ordered by score, then latency.
+        """
+        async with self._index_lock:
+            if time.monotonic() - self._index_at < settings.SAMPLER_REFRESH_INTERVAL:
+                return
+            try:
+                scores, latencies = await self._index_inputs()
+            except Exception as e:
+                if not self._index_at:
+                    raise
+                logger.warning(f"Failed to refresh the sampling index, serving the old one: {e}")
+                return
+            weights = {}
+            for member, latency in latencies:
+                if member in scores:
+                    weights[member] = scores[member] / max(latency, 1.0)
+            self._index.update(weights)
+            # latencies come sorted ascending and the sort is stable
+            self._fastest = sorted(weights, key=lambda m: -scores[m])
+            self._index_at = time.monotonic()
+
+    async def get_many(self, count: int, strategy: str = "best") -> list[ProxyRecord]:
+        """Get up to `count` distinct proxies using one of the selection strategies.
+
+        - best: the highest-scoring tiers, random within a tier
+        - fastest: highest score first, lowest latency EWMA within a score
+        - weighted: random, proportional to score / latency
+
+        fastest and weighted fall back to best until some proxy has passed a
+        check.
+        """
+        if strategy != "best":
+            await self._refresh_index()
+            members = []
+            if strategy == "fastest":
+                members = self._fastest[:count]
+            elif strategy == "weighted":
+                members = self._index.sample_many(count, random.random)
+            if members:
+                return await self._load(members)
+        return await self._pick_best(count)
+
+    async def get_random(self, strategy: str = "best") -> ProxyRecord | None:
+        """Get a single proxy, see get_many for the strategies."""
+        proxies = await self.get_many(1, strategy)
+        return proxies[0] if proxies else None
+
+    @staticmethod
+    def _format_stats(total: int, high_score: int, counters: dict, buried: int) -> dict:
+        """Lay out "band:<n>", "source:<name>" and "protocol:<name>" counters for /stats."""
+        width = settings.STATS_BAND_WIDTH
+        bands = {
+            f"{b * width}-{b * width + width - 1}": 0
+            for b in range(settings.MAX_SCORE // width + 1)
+        }
+        sources, protocols = {}, {}
+        for field, value in counters.items():
+            kind, _, name = field.partition(":")
+            value = int(value)
+            if kind == "band":
+                b = int(name)
+                bands[f"{b * width}-{b * width + width - 1}"] = value
+            elif value and kind == "source":
+                sources[name] = value
+            elif value and kind == "protocol":
+                protocols[name] = value
+        return {
+            "total": total,
+            "high_score": high_score,
+            "bands": bands,
+            "sources": sources,
+            "protocols": protocols,
+            "graveyard": buried,
+        }
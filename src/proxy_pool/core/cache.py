@@ -0,0 +1,82 @@
+import asyncio
+import random
+import time
+from proxy_pool.core.storage import storage
+from proxy_pool.schemas.proxy import ProxyRecord
+from proxy_pool.utils.config import settings
+from proxy_pool.utils.logger import logger
+
+class ProxyCache:
+    """In-process copy of the best-scoring proxies, used by /get.
+
+    Holds up to CACHE_SIZE proxies, best first, in a plain list, so requests
+    are answered without any network I/O. Once the copy is older than
+    CACHE_TTL, or a validator announced score changes, it is refreshed in the
+    background while the stale copy keeps serving.
+    """
+
+    def __init__(self):
+        self.proxies: list[ProxyRecord] = []
+        self._tiers: list[int] = []  # End offset of each score tier in proxies
+        self._expires_at = 0.0
+        self._refreshing: asyncio.Task | None = None
+        self._listener: asyncio.Task | None = None
+
+    async def start(self):
+        if settings.CACHE_ENABLED and settings.CACHE_SUBSCRIBE and not self._listener:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self):
+        for task in (self._listener, self._refreshing):
+            if task:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._listener = self._refreshing = None
+
+    async def _listen(self):
+        """Expire the cache whenever storage publishes a score change."""
+        while True:
+            try:
+                async for _ in storage.events():
+                    self._expires_at = 0.0
+            except Exception as e:
+                logger.warning(f"Cache subscription lost, retrying: {e}")
+                await asyncio.sleep(1)
+
+    async def refresh(self):
+        proxies = await storage.get_many(settings.CACHE_SIZE, "best")
+        tiers = [i for i in range(1, len(proxies)) if proxies[i].score != proxies[i - 1].score]
+        if proxies:
+            tiers.append(len(proxies))
+        self.proxies, self._tiers = proxies, tiers
+        self._expires_at = time.monotonic() + settings.CACHE_TTL
+
+    async def get_many(self, count: int) -> list[ProxyRecord] | None:
+        """Pick up to `count` distinct proxies the same way storage's best strategy does.
+
+        Returns None when the cache cannot answer (it holds fewer than `count`
+        proxies but the pool may have more), so the caller should go to storage.
+        """
+        if time.monotonic() >= self._expires_at:
+            if not self.proxies:
+                await self.refresh()
+            elif not self._refreshing or self._refreshing.done():
+                self._refreshing = asyncio.create_task(self.refresh())
+
+        if count > len(self.proxies) >= settings.CACHE_SIZE:
+            return None
+        if count == 1 and self._tiers:
+            return [self.proxies[random.randrange(self._tiers[0])]]
+
+        picked, start = [], 0
+        for end in self._tiers:
+            need = count - len(picked)
+            if end - start <= need:
+                picked.extend(self.proxies[start:end])
+            else:
+                picked.extend(random.sample(self.proxies[start:end], need))
+                break
+            start = end
+        return picked
+
+cache = ProxyCache()
@@ -0,0 +1,64 @@
+"""Encoding of the values stored in the proxy hash.
+
+The hash field is always host:port, so values only need the remaining
+fields. Two formats are supported and chosen with STORAGE_CODEC:
+
+- json: the Proxy model as JSON, the original format
+- packed: "score|protocol|anonymous|source", with common protocols stored as
+  a one-digit code
+
+decode() reads both, so a pool can be switched between them while it is
+being rewritten (see RedisClient.sync_codec).
+"""
+import json
+import sys
+from pydantic_core import from_json
+from proxy_pool.schemas.proxy import Proxy, ProxyRecord
+from proxy_pool.utils.config import settings
+
+PROTOCOLS = ("http", "https", "socks4", "socks5")
+_PROTOCOL_CODES = {name: str(code) for code, name in enumerate(PROTOCOLS)}
+
+def _encode_json(proxy: Proxy | ProxyRecord) -> str:
+    return json.dumps({
+        "host": proxy.host,
+        "port": proxy.port,
+        "score": proxy.score,
+        "protocol": proxy.protocol,
+        "anonymous": proxy.anonymous,
+        "source": proxy.source,
+    }, separators=(",", ":"))
+
+def _encode_packed(proxy: Proxy | ProxyRecord) -> str:
+    protocol = _PROTOCOL_CODES.get(proxy.protocol, proxy.protocol)
+    return f"{proxy.score}|{protocol}|{int(proxy.anonymous)}|{proxy.source or ''}"
+
+_ENCODERS = {"json": _encode_json, "packed": _encode_packed}
+
+def encode(proxy: Proxy | ProxyRecord) -> str:
+    """Encode a proxy with the configured codec."""
+    return _ENCODERS[settings.STORAGE_CODEC](proxy)
+
+def is_current(value: str) -> bool:
+    """Whether a stored value is already in the configured format."""
+    return value.startswith("{") == (settings.STORAGE_CODEC == "json")
+
+def decode(member: str, value: str) -> ProxyRecord:
+    """Build a record from a hash field and value in either format."""
+    host, _, port = member.rpartition(":")
+    if value.startswith("{"):
+        data = from_json(value)
+        source = data.get("source")
+        return ProxyRecord(
+            host, int(port), data.get("score", settings.INITIAL_SCORE),
+            data.get("protocol", "http"), data.get("anonymous", True),
+            source and sys.intern(source)
+        )
+    score, protocol, anonymous, source = value.split("|", 3)
+    if len(protocol) == 1 and protocol.isdigit():
+        protocol = PROTOCOLS[int(protocol)]
+    # Few distinct sources exist, so share one string per name across records
+    return ProxyRecord(
+        host, int(port), int(score), protocol, anonymous == "1",
+        sys.intern(source) if source else None
+    )
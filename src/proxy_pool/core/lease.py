@@ -0,0 +1,56 @@
+import asyncio
+import os
+import socket
+import uuid
+from proxy_pool.core.storage import storage
+from proxy_pool.utils.config import settings
+from proxy_pool.utils.logger import logger
+
+class Lease:
+    """A storage lease that at most one node holds at a time.
+
+    Every worker node contends for it and the holder keeps renewing it every
+    third of LEASE_TTL, so when the holder dies another node takes over
+    within LEASE_TTL seconds. `held` is this node's current view.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.held = False
+        self._renewer: asyncio.Task | None = None
+
+    async def start(self):
+        """Contend once right away, then keep contending in the background."""
+        await self.renew()
+        if not self._renewer:
+            self._renewer = asyncio.create_task(self._renew_periodically())
+
+    async def close(self):
+        if self._renewer:
+            self._renewer.cancel()
+            await asyncio.gather(self._renewer, return_exceptions=True)
+            self._renewer = None
+        if self.held:
+            # Let another node take over now instead of after LEASE_TTL
+            await storage.release_lease(self.name, self.holder)
+            self.held = False
+
+    async def renew(self):
+        try:
+            held = await storage.acquire_lease(self.name, self.holder, settings.LEASE_TTL)
+        except Exception as e:
+            # Can't tell whether it expired, so stop acting as the holder
+            logger.warning(f"Renewing the {self.name} lease failed: {e}")
+            held = False
+        if held != self.held:
+            logger.info(f"{'Acquired' if held else 'Lost'} the {self.name} lease")
+        self.held = held
+
+    async def _renew_periodically(self):
+        while True:
+            await asyncio.sleep(settings.LEASE_TTL / 3)
+            await self.renew()
+
+# Held by the node that runs the fetchers
+fetch_lease = Lease("fetch")
@@ -0,0 +1,355 @@
+import asyncio
+import heapq
+import json
+import os
+import random
+import time
+from collections.abc import AsyncIterator
+from proxy_pool.core import codec
+from proxy_pool.core.backend import BaseStorage
+from proxy_pool.schemas.proxy import Proxy, ProxyRecord
+from proxy_pool.utils.config import settings
+from proxy_pool.utils.logger import logger
+
+class _Tier:
+    """Members sharing one score: a list for O(1) random picks plus their positions."""
+
+    __slots__ = ("members", "slots")
+
+    def __init__(self):
+        self.members: list[str] = []
+        self.slots: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def add(self, member: str):
+        self.slots[member] = len(self.members)
+        self.members.append(member)
+
+    def remove(self, member: str):
+        slot = self.slots.pop(member)
+        last = self.members.pop()
+        if last != member:
+            self.members[slot] = last
+            self.slots[last] = slot
+
+def _copy(proxy: ProxyRecord) -> ProxyRecord:
+    return ProxyRecord(
+        proxy.host, proxy.port, proxy.score, proxy.protocol,
+        proxy.anonymous, proxy.source, proxy.latency, proxy.last_success
+    )
+
+class MemoryStorage(BaseStorage):
+    """Pool kept in this process, for single-node deployments and tests.
+
+    Every operation is plain dict and list work with no I/O: records by
+    member, members bucketed by score for the best strategy, and a heap of
+    next-check times for claim_due (stale heap entries are skipped when
+    popped). Only the process that owns it can see the pool, so run a
+    single worker. With MEMORY_SNAPSHOT_PATH set the pool is loaded on start
+    and written back every MEMORY_SNAPSHOT_INTERVAL seconds and on close.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.proxies: dict[str, ProxyRecord] = {}
+        self.tiers: dict[int, _Tier] = {}
+        self.due: dict[str, float] = {}
+        self._due_heap: list[tuple[float, str]] = []
+        # Proxies removed for failing: member -> unix time they may be re-added
+        self.graveyard: dict[str, float] = {}
+        self._graveyard_heap: list[tuple[float, str]] = []
+        # Same "band:<n>", "source:<name>", "protocol:<name>" counters as Redis
+        self.counters: dict[str, int] = {}
+        self._subscribers: set[asyncio.Queue] = set()
+        self.leases: dict[str, tuple[str, float]] = {}  # name -> (holder, expiry)
+        self._snapshots: asyncio.Task | None = None
+
+    async def start(self):
+        path = settings.MEMORY_SNAPSHOT_PATH
+        if path and os.path.exists(path):
+            self.load_snapshot(path)
+        if path and settings.MEMORY_SNAPSHOT_INTERVAL > 0 and not self._snapshots:
+            self._snapshots = asyncio.create_task(self._snapshot_periodically(path))
+
+    async def close(self):
+        await super().close()
+        if self._snapshots:
+            self._snapshots.cancel()
+            await asyncio.gather(self._snapshots, return_exceptions=True)
+            self._snapshots = None
+        if settings.MEMORY_SNAPSHOT_PATH:
+            await self.save_snapshot(settings.MEMORY_SNAPSHOT_PATH)
+
+    def _count(self, proxy: ProxyRecord, score: int, delta: int):
+        width = settings.STATS_BAND_WIDTH
+        for field in (f"band:{score // width}", f"source:{proxy.source or 'unknown'}", f"protocol:{proxy.protocol}"):
+            self.counters[field] = self.counters.get(field, 0) + delta
+
+    def _schedule(self, member: str, when: float):
+        self.due[member] = when
+        heapq.heappush(self._due_heap, (when, member))
+
+    def _bury(self, member: str, until: float):
+        self.graveyard[member] = until
+        heapq.heappush(self._graveyard_heap, (until, member))
+
+    def _tier(self, score: int) -> _Tier:
+        tier = self.tiers.get(score)
+        if tier is None:
+            tier = self.tiers[score] = _Tier()
+        return tier
+
+    def _untier(self, member: str, score: int):
+        tier = self.tiers[score]
+        tier.remove(member)
+        if not tier:
+            del self.tiers[score]
+
+    def _insert(self, proxy: ProxyRecord, due: float):
+        member = proxy.string
+        self.proxies[member] = proxy
+        self._tier(proxy.score).add(member)
+        self._schedule(member, due)
+        self._count(proxy, proxy.score, 1)
+
+    def _remove(self, member: str) -> bool:
+        proxy = self.proxies.pop(member, None)
+        if proxy is None:
+            return False
+        self._untier(member, proxy.score)
+        del self.due[member]  # Its heap entries go stale and are skipped
+        self._count(proxy, proxy.score, -1)
+        return True
+
+    def _add(self, proxy: Proxy, now: float) -> bool:
+        member = proxy.string
+        buried = self.graveyard.get(member)
+        if buried is not None:
+            if buried > now:
+                return False
+            del self.graveyard[member]
+        if member in self.proxies:
+            return False
+        self._insert(ProxyRecord(
+            proxy.host, proxy.port, proxy.score, proxy.protocol, proxy.anonymous, proxy.source
+        ), now)
+        return True
+
+    def _expire_graveyard(self, now: float):
+        heap = self._graveyard_heap
+        while heap and heap[0][0] <= now:
+            until, member = heapq.heappop(heap)
+            if self.graveyard.get(member) == until:
+                del self.graveyard[member]
+
+    def _publish(self, message: str):
+        for queue in self._subscribers:
+            if not queue.full():
+                queue.put_nowait(message)
+
+    async def add(self, proxy: Proxy):
+        return self._add(proxy, time.time())
+
+    async def add_many(self, proxies: list[Proxy]) -> int:
+        now = time.time()
+        self._expire_graveyard(now)
+        added = sum(self._add(proxy, now) for proxy in proxies)
+        if added:
+            self._publish("added")
+        return added
+
+    async def delete(self, proxy: Proxy | ProxyRecord):
+        return int(self._remove(proxy.string))
+
+    def _adjust(self, member: str, delta: int, now: float, latency: float | None) -> int | None:
+        proxy = self.proxies.get(member)
+        if proxy is None:
+            return None
+        old = proxy.score
+        score = min(old + delta, settings.MAX_SCORE)
+        if score <= settings.MIN_SCORE:
+            self._remove(member)
+            if settings.GRAVEYARD_TTL > 0:
+                self._bury(member, now + settings.GRAVEYARD_TTL)
+            return score
+        if score != old:
+            self._untier(member, old)
+            self._tier(score).add(member)
+            width = settings.STATS_BAND_WIDTH
+            if old // width != score // width:
+                self.counters[f"band:{old // width}"] -= 1
+                self.counters[f"band:{score // width}"] = self.counters.get(f"band:{score // width}", 0) + 1
+            proxy.score = score
+        lo, hi = settings.VALIDATE_MIN_INTERVAL, settings.VALIDATE_MAX_INTERVAL
+        interval = lo
+        if delta > 0:
+            interval = lo + (hi - lo) * score / settings.MAX_SCORE
+            proxy.last_success = now
+            if latency is not None:
+                if proxy.latency is not None:
+                    alpha = settings.LATENCY_EWMA_ALPHA
+                    latency = alpha * latency + (1 - alpha) * proxy.latency
+                proxy.latency = latency
+        self._schedule(member, now + interval)
+        return score
+
+    async def adjust_score(self, proxy: ProxyRecord, delta: int, latency: float | None = None) -> int | None:
+        score = self._adjust(proxy.string, delta, time.time(), latency)
+        if score is None:
+            return None
+        if score <= settings.MIN_SCORE:
+            logger.info(f"Removing proxy {proxy.string} (score {score})")
+        else:
+            proxy.score = score
+        return score
+
+    async def record_results(self, results: list[tuple[ProxyRecord, float | None]]) -> list[int | None]:
+        now = time.time()
+        scores = [
+            self._adjust(proxy.string, -settings.SCORE_DECREMENT if latency is None else settings.SCORE_INCREMENT, now, latency)
+            for proxy, latency in results
+        ]
+        self._publish("scores")
+        removed = sum(1 for s in scores if s is not None and s <= settings.MIN_SCORE)
+        if removed:
+            logger.info(f"Removed {removed} proxies that reached the minimum score")
+        return scores
+
+    async def _index_inputs(self) -> tuple[dict[str, float], list[tuple[str, float]]]:
+        scores = {m: p.score for m, p in self.proxies.items()}
+        latencies = sorted(
+            ((m, p.latency) for m, p in self.proxies.items() if p.latency is not None),
+            key=lambda pair: pair[1]
+        )
+        return scores, latencies
+
+    async def _load(self, members: list[str]) -> list[ProxyRecord]:
+        return [_copy(self.proxies[m]) for m in members if m in self.proxies]
+
+    async def _pick_best(self, count: int) -> list[ProxyRecord]:
+        picked = []
+        for score in sorted(self.tiers, reverse=True):
+            members = self.tiers[score].members
+            need = count - len(picked)
+            if len(members) <= need:
+                picked.extend(members)
+            else:
+                picked.extend(random.sample(members, need))
+                break
+        return [_copy(self.proxies[m]) for m in picked]
+
+    async def get_all(self) -> list[ProxyRecord]:
+        return [_copy(p) for p in self.proxies.values()]
+
+    async def scan(self) -> AsyncIterator[ProxyRecord]:
+        async for page in self.scan_pages():
+            for proxy in page:
+                yield proxy
+
+    async def scan_pages(
+        self,
+        min_score: int | None = None,
+        protocol: str | None = None,
+        source: str | None = None,
+    ) -> AsyncIterator[list[ProxyRecord]]:
+        """Pages over a snapshot of the members; ones removed meanwhile are skipped."""
+        members = list(self.proxies)
+        size = settings.SCAN_BATCH_SIZE
+        for i in range(0, len(members), size):
+            page = []
+            for member in members[i:i + size]:
+                proxy = self.proxies.get(member)
+                if (
+                    proxy is not None
+                    and (min_score is None or proxy.score >= min_score)
+                    and (protocol is None or proxy.protocol == protocol)
+                    and (source is None or proxy.source == source)
+                ):
+                    page.append(_copy(proxy))
+            yield page
+
+    async def claim_due(self, limit: int) -> list[ProxyRecord]:
+        now = time.time()
+        lease = now + settings.VALIDATE_LEASE
+        heap, claimed = self._due_heap, []
+        while heap and heap[0][0] <= now and len(claimed) < limit:
+            when, member = heapq.heappop(heap)
+            if self.due.get(member) != when:
+                continue  # Rescheduled or removed since
+            self._schedule(member, lease)
+            claimed.append(_copy(self.proxies[member]))
+        return claimed
+
+    async def count(self) -> int:
+        return len(self.proxies)
+
+    async def stats(self) -> dict:
+        now = time.time()
+        high_score = sum(len(tier) for score, tier in self.tiers.items() if score >= settings.MAX_SCORE)
+        buried = sum(1 for until in self.graveyard.values() if until > now)
+        return self._format_stats(len(self.proxies), high_score, self.counters, buried)
+
+    async def events(self) -> AsyncIterator[str]:
+        queue = asyncio.Queue(maxsize=1)  # Subscribers only need to know something changed
+        self._subscribers.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+
+    async def acquire_lease(self, name: str, holder: str, ttl: float) -> bool:
+        now = time.monotonic()
+        current = self.leases.get(name)
+        if current and current[0] != holder and current[1] > now:
+            return False
+        self.leases[name] = (holder, now + ttl)
+        return True
+
+    async def release_lease(self, name: str, holder: str):
+        if self.leases.get(name, ("",))[0] == holder:
+            del self.leases[name]
+
+    def load_snapshot(self, path: str):
+        """Replace the pool with the one saved at `path`."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.__init__()
+        now = time.time()
+        for member, value, score, latency, last_success, due in data["proxies"]:
+            proxy = codec.decode(member, value)
+            proxy.score, proxy.latency, proxy.last_success = score, latency, last_success
+            self._insert(proxy, due)
+        for member, until in data["graveyard"].items():
+            if until > now:
+                self._bury(member, until)
+        logger.info(f"Loaded {len(self.proxies)} proxies from {path}")
+
+    async def save_snapshot(self, path: str):
+        """Write the pool to `path` atomically; the file is written off the event loop."""
+        # Captured in one go, so the snapshot is consistent
+        data = {
+            "proxies": [
+                [m, codec.encode(p), p.score, p.latency, p.last_success, self.due[m]]
+                for m, p in self.proxies.items()
+            ],
+            "graveyard": dict(self.graveyard),
+        }
+        await asyncio.to_thread(self._write, path, data)
+
+    @staticmethod
+    def _write(path: str, data: dict):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    async def _snapshot_periodically(self, path: str):
+        while True:
+            await asyncio.sleep(settings.MEMORY_SNAPSHOT_INTERVAL)
+            try:
+                await self.save_snapshot(path)
+            except Exception as e:
+                logger.warning(f"Saving snapshot to {path} failed: {e}")
@@ -0,0 +1,122 @@
+from collections.abc import Callable
+
+class WeightedIndex:
+    """Fenwick tree over per-member weights.
+
+    Setting a weight and drawing a weighted sample are both O(log n), so the
+    index can be kept in sync with the pool by applying only what changed
+    instead of being rebuilt for every request.
+    """
+
+    def __init__(self):
+        self.members: list[str | None] = []
+        self.weights: list[float] = []
+        self.tree: list[float] = [0.0]  # 1-based partial sums
+        self.slots: dict[str, int] = {}
+        self.free: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    @property
+    def total(self) -> float:
+        return self._prefix(len(self.weights))
+
+    def _prefix(self, i: int) -> float:
+        total = 0.0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def _add(self, i: int, delta: float):
+        i += 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def _append(self, member: str, weight: float) -> int:
+        slot = len(self.weights)
+        i = slot + 1
+        self.members.append(member)
+        self.weights.append(weight)
+        # A new node covers (i - lowbit(i), i]; everything but itself is already summed
+        self.tree.append(weight + self._prefix(i - 1) - self._prefix(i - (i & -i)))
+        return slot
+
+    def set(self, member: str, weight: float):
+        slot = self.slots.get(member)
+        if slot is None:
+            if self.free:
+                slot = self.free.pop()
+                self.members[slot] = member
+                self._add(slot, weight)
+                self.weights[slot] = weight
+            else:
+                slot = self._append(member, weight)
+            self.slots[member] = slot
+        elif weight != self.weights[slot]:
+            self._add(slot, weight - self.weights[slot])
+            self.weights[slot] = weight
+
+    def remove(self, member: str):
+        slot = self.slots.pop(member, None)
+        if slot is None:
+            return
+        self._add(slot, -self.weights[slot])
+        self.weights[slot] = 0.0
+        self.members[slot] = None
+        self.free.append(slot)
+
+    def update(self, weights: dict[str, float]):
+        """Make the index hold exactly `weights`, touching only changed slots."""
+        if len(self.free) > len(self.slots):
+            # Mostly empty: compact, which also drops accumulated float error
+            self.__init__()
+        for member in [m for m in self.slots if m not in weights]:
+            self.remove(member)
+        for member, weight in weights.items():
+            self.set(member, weight)
+
+    def sample(self, rand: float) -> str | None:
+        """Pick a member with probability proportional to its weight.
+
+        `rand` is a uniform float in [0, 1).
+        """
+        target = rand * self.total
+        i, step = 0, 1 << len(self.weights).bit_length()
+        while step:
+            nxt = i + step
+            if nxt < len(self.tree) and self.tree[nxt] <= target:
+                target -= self.tree[nxt]
+                i = nxt
+            step >>= 1
+        # i is now the number of slots whose cumulative weight is <= target;
+        # float drift can land on an empty slot, so step to a live neighbour
+        while i < len(self.weights) and self.weights[i] <= 0:
+            i += 1
+        while i >= len(self.weights) or self.weights[i] <= 0:
+            i -= 1
+            if i < 0:
+                return None
+        return self.members[i]
+
+    def sample_many(self, count: int, rand: Callable[[], float]) -> list[str]:
+        """Pick up to `count` distinct members, weighted, without replacement."""
+        picked, taken = [], []
+        try:
+            while len(picked) < count:
+                member = self.sample(rand())
+                if member is None:
+                    break
+                slot = self.slots[member]
+                taken.append((slot, self.weights[slot]))
+                # Hide the pick from later draws; restored below
+                self._add(slot, -self.weights[slot])
+                self.weights[slot] = 0.0
+                picked.append(member)
+        finally:
+            for slot, weight in taken:
+                self._add(slot, weight)
+                self.weights[slot] = weight
+        return picked
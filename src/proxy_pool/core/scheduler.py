@@ -1,39 +1,88 @@
+import asyncio
+import time
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from proxy_pool.fetchers.common import KuaidailiFetcher, ProxyListPlusFetcher
+from proxy_pool.fetchers.base import BaseFetcher
+from proxy_pool.fetchers.registry import discover
+from proxy_pool.core.lease import fetch_lease
 from proxy_pool.core.validator import validator
 from proxy_pool.core.storage import storage
+from proxy_pool.utils import metrics
+from proxy_pool.utils.config import settings
 from proxy_pool.utils.logger import logger
 
 class Scheduler:
     def __init__(self):
         self.scheduler = AsyncIOScheduler()
-        self.fetchers = [
-            KuaidailiFetcher(),
-            ProxyListPlusFetcher()
-        ]
+        self.fetchers = discover()
+
+    async def _run_fetcher(self, fetcher: BaseFetcher):
+        if not fetch_lease.held:
+            return  # Another node fetches
+        added = 0
+        start = time.perf_counter()
+        try:
+            # Ingest in batches as the fetcher yields, so large lists never sit in memory
+            async with asyncio.timeout(settings.FETCH_DEADLINE):
+                batch = []
+                async for proxy in fetcher.stream():
+                    batch.append(proxy)
+                    if len(batch) >= settings.INGEST_BATCH_SIZE:
+                        added += await storage.add_many(batch)
+                        batch = []
+                if batch:
+                    added += await storage.add_many(batch)
+            logger.info(f"Fetcher {fetcher.name} added {added} new proxies")
+        except TimeoutError:
+            logger.error(f"Fetcher {fetcher.name} timed out after {settings.FETCH_DEADLINE}s")
+            metrics.FETCH_ERRORS.labels(fetcher.name).inc()
+        except Exception as e:
+            logger.error(f"Fetcher {fetcher.name} failed: {e}")
+            metrics.FETCH_ERRORS.labels(fetcher.name).inc()
+        metrics.FETCH_SECONDS.labels(fetcher.name).observe(time.perf_counter() - start)
+        metrics.FETCHED.labels(fetcher.name).inc(added)
+        self._reschedule(fetcher, added)
+
+    def _reschedule(self, fetcher: BaseFetcher, added: int):
+        interval = fetcher.record_yield(added)
+        job_id = f"fetch:{fetcher.name}"
+        if self.scheduler.get_job(job_id):
+            self.scheduler.reschedule_job(job_id, trigger='interval', seconds=interval)
+        logger.debug(f"Fetcher {fetcher.name} next run in {interval:.0f}s")
 
     async def fetch_task(self):
-        """Task to run all fetchers."""
+        """Task to run all fetchers concurrently.
+
+        Each fetcher gets FETCH_DEADLINE seconds, so one slow source cannot
+        hold up the others and a cycle takes about as long as the slowest one.
+        Only the node holding the fetch lease fetches.
+        """
+        if not fetch_lease.held:
+            logger.info("Not holding the fetch lease, leaving fetching to another node.")
+            return
         logger.info("Starting fetch task...")
-        for fetcher in self.fetchers:
-            try:
-                proxies = await fetcher.fetch()
-                for proxy in proxies:
-                    await storage.add(proxy)
-            except Exception as e:
-                logger.error(f"Fetcher {fetcher.name} failed: {e}")
+        start = time.perf_counter()
+        await asyncio.gather(*(self._run_fetcher(f) for f in self.fetchers))
+        metrics.CYCLE_SECONDS.labels("fetch").observe(time.perf_counter() - start)
         logger.info("Fetch task complete.")
 
     async def validate_task(self):
-        """Task to run validation."""
-        await validator.run_validation()
+        """Task to keep validating proxies as they come due."""
+        await validator.run_forever()
 
     def start(self):
-        # Initial run
-        self.scheduler.add_job(self.fetch_task, 'interval', minutes=30, id='fetch_proxies')
-        self.scheduler.add_job(self.validate_task, 'interval', minutes=5, id='validate_proxies')
+        # Validation is continuous (see validate_task); each fetcher runs on its
+        # own interval, adjusted after every run from the yield it produced
+        for fetcher in self.fetchers:
+            self.scheduler.add_job(
+                self._run_fetcher, 'interval', seconds=fetcher.next_interval,
+                args=[fetcher], id=f"fetch:{fetcher.name}"
+            )
         
         self.scheduler.start()
-        logger.info("Scheduler started.")
+        logger.info(f"Scheduler started with fetchers: {', '.join(f.name for f in self.fetchers)}")
+
+    def close(self):
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
 
 scheduler = Scheduler()
@@ -0,0 +1,238 @@
+"""Lua scripts registered by RedisClient.
+
+Every pool script keeps the proxy hash, its indexes and the stats counters
+consistent in a single round trip. All pool scripts take the same KEYS:
+
+KEYS[1] score index, KEYS[2] proxy hash, KEYS[3] due index,
+KEYS[4] latency index, KEYS[5] last-success index, KEYS[6] stats counters,
+KEYS[7] graveyard (proxies removed for failing, scored by when they may return)
+
+The lease scripts at the end take the lease key as their only KEYS[1].
+ARGV layouts are documented above each script.
+"""
+
+# Shared helpers.
+# load() returns {member, value, score, latency, last_success}; missing parts
+# are false.
+# remove() drops a proxy everywhere and takes it out of the counters, where
+# `score` is the score it was counted under.
+_HELPERS = """
+local function load(member)
+    return {
+        member,
+        redis.call('HGET', KEYS[2], member),
+        redis.call('ZSCORE', KEYS[1], member),
+        redis.call('ZSCORE', KEYS[4], member),
+        redis.call('ZSCORE', KEYS[5], member),
+    }
+end
+
+local function band(score, width)
+    return 'band:' .. math.floor(score / width)
+end
+
+local function count(score, width, source, protocol, delta)
+    redis.call('HINCRBY', KEYS[6], band(score, width), delta)
+    redis.call('HINCRBY', KEYS[6], 'source:' .. source, delta)
+    redis.call('HINCRBY', KEYS[6], 'protocol:' .. protocol, delta)
+end
+
+local function remove(member, score, width, source, protocol)
+    redis.call('HDEL', KEYS[2], member)
+    for _, key in ipairs({KEYS[1], KEYS[3], KEYS[4], KEYS[5]}) do
+        redis.call('ZREM', key, member)
+    end
+    count(score, width, source, protocol, -1)
+end
+"""
+
+# ARGV[1] member, ARGV[2] encoded proxy, ARGV[3] score, ARGV[4] now,
+# ARGV[5] stats band width, ARGV[6] source, ARGV[7] protocol
+# Adds the proxy if it is not stored yet and not in the graveyard, and makes
+# it due now. Returns 1 if it was added, 0 if it already existed or is buried.
+ADD = _HELPERS + """
+local buried = redis.call('ZSCORE', KEYS[7], ARGV[1])
+if buried then
+    if tonumber(buried) > tonumber(ARGV[4]) then
+        return 0
+    end
+    redis.call('ZREM', KEYS[7], ARGV[1])
+end
+if redis.call('HSETNX', KEYS[2], ARGV[1], ARGV[2]) == 0 then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+redis.call('ZADD', KEYS[3], 'NX', ARGV[4], ARGV[1])
+count(tonumber(ARGV[3]), tonumber(ARGV[5]), ARGV[6], ARGV[7], 1)
+return 1
+"""
+
+# ARGV[1] member, ARGV[2] stats band width, ARGV[3] source, ARGV[4] protocol
+# Returns 1 if the proxy was removed, 0 if it was not stored.
+DELETE = _HELPERS + """
+local score = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not score then
+    return redis.call('HDEL', KEYS[2], ARGV[1])
+end
+remove(ARGV[1], tonumber(score), tonumber(ARGV[2]), ARGV[3], ARGV[4])
+return 1
+"""
+
+# ARGV[1] number of distinct proxies wanted, ARGV[2] random seed
+# Walks score tiers from the top, taking whole tiers while they fit and a
+# random subset of the tier that overflows. Returns the load() rows
+# flattened in order, best first.
+PICK_BEST = _HELPERS + """
+math.randomseed(tonumber(ARGV[2]))
+local wanted = tonumber(ARGV[1])
+local total = redis.call('ZCARD', KEYS[1])
+local out = {}
+local picked, rank = 0, 0
+local function take(member)
+    local row = load(member)
+    for i = 1, 5 do
+        out[#out + 1] = row[i]
+    end
+    picked = picked + 1
+end
+while picked < wanted and rank < total do
+    local score = redis.call('ZREVRANGE', KEYS[1], rank, rank, 'WITHSCORES')[2]
+    local tier = redis.call('ZCOUNT', KEYS[1], score, score)
+    local need = wanted - picked
+    if tier <= need then
+        for _, member in ipairs(redis.call('ZREVRANGE', KEYS[1], rank, rank + tier - 1)) do
+            take(member)
+        end
+    else
+        -- Partial Fisher-Yates over the tier's ranks, touching only `need` slots
+        local swapped = {}
+        for i = 0, need - 1 do
+            local j = math.random(i, tier - 1)
+            local pick = swapped[j] or j
+            swapped[j] = swapped[i] or i
+            take(redis.call('ZREVRANGE', KEYS[1], rank + pick, rank + pick)[1])
+        end
+    end
+    rank = rank + tier
+end
+return out
+"""
+
+# ARGV members to load. Returns the load() rows flattened in order.
+LOAD_MANY = _HELPERS + """
+local out = {}
+for _, member in ipairs(ARGV) do
+    local row = load(member)
+    for i = 1, 5 do
+        out[#out + 1] = row[i]
+    end
+end
+return out
+"""
+
+# ARGV[1] member, ARGV[2] score delta, ARGV[3] MIN_SCORE, ARGV[4] MAX_SCORE,
+# ARGV[5] now, ARGV[6] min recheck interval, ARGV[7] max recheck interval,
+# ARGV[8] measured latency in ms ('' if unknown), ARGV[9] latency EWMA alpha,
+# ARGV[10] stats band width, ARGV[11] source, ARGV[12] protocol,
+# ARGV[13] graveyard cool-down in seconds (0 to not bury)
+# Returns the new score (the proxy is deleted and buried when it is <= MIN_SCORE),
+# or nil when the proxy is no longer in the pool. Surviving proxies are
+# rescheduled: failures come back after the min interval, passes back off
+# towards the max interval as their score climbs.
+ADJUST_SCORE = _HELPERS + """
+local old = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not old then
+    return nil
+end
+old = tonumber(old)
+local width = tonumber(ARGV[10])
+local max_score = tonumber(ARGV[4])
+local score = math.min(old + tonumber(ARGV[2]), max_score)
+if score <= tonumber(ARGV[3]) then
+    remove(ARGV[1], old, width, ARGV[11], ARGV[12])
+    if tonumber(ARGV[13]) > 0 then
+        redis.call('ZADD', KEYS[7], tonumber(ARGV[5]) + tonumber(ARGV[13]), ARGV[1])
+    end
+    return score
+end
+redis.call('ZADD', KEYS[1], score, ARGV[1])
+if band(old, width) ~= band(score, width) then
+    redis.call('HINCRBY', KEYS[6], band(old, width), -1)
+    redis.call('HINCRBY', KEYS[6], band(score, width), 1)
+end
+local now = tonumber(ARGV[5])
+local lo, hi = tonumber(ARGV[6]), tonumber(ARGV[7])
+local interval = lo
+if tonumber(ARGV[2]) > 0 then
+    interval = lo + (hi - lo) * score / max_score
+    redis.call('ZADD', KEYS[5], now, ARGV[1])
+    local latency = tonumber(ARGV[8])
+    if latency then
+        local previous = redis.call('ZSCORE', KEYS[4], ARGV[1])
+        if previous then
+            local alpha = tonumber(ARGV[9])
+            latency = alpha * latency + (1 - alpha) * tonumber(previous)
+        end
+        redis.call('ZADD', KEYS[4], latency, ARGV[1])
+    end
+end
+redis.call('ZADD', KEYS[3], now + interval, ARGV[1])
+return score
+"""
+
+# ARGV[1] now, ARGV[2] max proxies to claim, ARGV[3] lease deadline
+# Claims proxies whose next check is due by pushing them to the lease
+# deadline, so concurrent validators never pick the same proxy and a crashed
+# one only delays it. Returns member, value pairs flattened.
+CLAIM_DUE = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+local claimed = {}
+for _, member in ipairs(due) do
+    local value = redis.call('HGET', KEYS[2], member)
+    if value then
+        redis.call('ZADD', KEYS[3], ARGV[3], member)
+        claimed[#claimed + 1] = member
+        claimed[#claimed + 1] = value
+    else
+        redis.call('ZREM', KEYS[3], member)
+    end
+end
+return claimed
+"""
+
+# ARGV member, value pairs
+# Rewrites values in place, skipping proxies removed in the meantime so a
+# rewrite never resurrects one. Returns the number rewritten.
+RECODE = """
+local n = 0
+for i = 1, #ARGV, 2 do
+    if redis.call('HEXISTS', KEYS[2], ARGV[i]) == 1 then
+        redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+        n = n + 1
+    end
+end
+return n
+"""
+
+# ARGV[1] holder, ARGV[2] lease duration in ms
+# Takes the lease if it is free, or extends it if `holder` already has it.
+# Returns 1 if `holder` holds the lease now, 0 if someone else does.
+ACQUIRE_LEASE = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return 1
+end
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# ARGV[1] holder
+# Frees the lease only if `holder` still has it. Returns 1 if it was freed.
+RELEASE_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
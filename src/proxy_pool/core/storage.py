@@ -1,12 +1,17 @@
-import json
 import random
+import time
+from collections.abc import AsyncIterator
 from redis import asyncio as aioredis
+from proxy_pool.core import codec, scripts
+from proxy_pool.core.backend import BaseStorage
+from proxy_pool.utils import metrics
 from proxy_pool.utils.config import settings
-from proxy_pool.schemas.proxy import Proxy
+from proxy_pool.schemas.proxy import Proxy, ProxyRecord
 from proxy_pool.utils.logger import logger
 
-class RedisClient:
+class RedisClient(BaseStorage):
     def __init__(self):
+        super().__init__()
         self.redis = aioredis.Redis(
             host=settings.REDIS_HOST,
             port=settings.REDIS_PORT,
@@ -15,46 +20,336 @@ class RedisClient:
             decode_responses=True
         )
         self.key = "proxies"
+        # Sorted set mirroring the hash: member = host:port, score = proxy score
+        self.score_key = f"{self.key}:score"
+        # Sorted set of next-check timestamps: member = host:port, score = unix time
+        self.due_key = f"{self.key}:due"
+        # Latency EWMA in ms and last passed check, kept for proxies that have passed
+        self.latency_key = f"{self.key}:latency"
+        self.success_key = f"{self.key}:last_success"
+        # Counters per score band, source and protocol, kept by the scripts
+        self.stats_key = f"{self.key}:stats"
+        # Sorted set of proxies removed for failing: score = unix time they may be re-added
+        self.graveyard_key = f"{self.key}:graveyard"
+        # Name of the codec the hash values were last fully written with
+        self.codec_key = f"{self.key}:codec"
+        # Pub/sub channel announcing that scores changed
+        self.events_key = f"{self.key}:events"
+        # Prefix of the keys holding leases, value = holder id
+        self.lease_key = f"{self.key}:lease"
+        # KEYS shared by every script, see core/scripts.py
+        self._keys = [
+            self.score_key, self.key, self.due_key,
+            self.latency_key, self.success_key, self.stats_key, self.graveyard_key
+        ]
+        self._add = self.redis.register_script(scripts.ADD)
+        self._delete = self.redis.register_script(scripts.DELETE)
+        self._pick_best_script = self.redis.register_script(scripts.PICK_BEST)
+        self._load_many = self.redis.register_script(scripts.LOAD_MANY)
+        self._adjust_score = self.redis.register_script(scripts.ADJUST_SCORE)
+        self._claim_due = self.redis.register_script(scripts.CLAIM_DUE)
+        self._recode = self.redis.register_script(scripts.RECODE)
+        self._acquire_lease = self.redis.register_script(scripts.ACQUIRE_LEASE)
+        self._release_lease = self.redis.register_script(scripts.RELEASE_LEASE)
+
+    async def start(self):
+        await self.sync_codec()
+        await self.sync_index()
+
+    async def close(self):
+        await super().close()
+        await self.redis.aclose()
+
+    def _add_args(self, proxy: Proxy, now: float) -> dict:
+        return {
+            "keys": self._keys,
+            "args": [
+                proxy.string, codec.encode(proxy), proxy.score, now,
+                settings.STATS_BAND_WIDTH, proxy.source or "unknown", proxy.protocol
+            ],
+        }
+
+    def _delete_args(self, proxy: Proxy | ProxyRecord) -> dict:
+        return {
+            "keys": self._keys,
+            "args": [proxy.string, settings.STATS_BAND_WIDTH, proxy.source or "unknown", proxy.protocol],
+        }
 
     async def add(self, proxy: Proxy):
-        """Add a proxy if it doesn't exist, otherwise ignore."""
-        if not await self.redis.hexists(self.key, proxy.string):
-            return await self.redis.hset(self.key, proxy.string, proxy.model_dump_json())
-
-    async def update(self, proxy: Proxy):
-        """Update proxy information."""
-        return await self.redis.hset(self.key, proxy.string, proxy.model_dump_json())
-
-    async def decrease(self, proxy: Proxy):
-        """Decrease score and delete if below minimum."""
-        proxy.score -= settings.SCORE_DECREMENT
-        if proxy.score <= settings.MIN_SCORE:
-            logger.info(f"Removing proxy {proxy.string} (score {proxy.score})")
-            return await self.redis.hdel(self.key, proxy.string)
-        return await self.update(proxy)
-
-    async def increase(self, proxy: Proxy):
-        """Increase score up to maximum."""
-        proxy.score = min(proxy.score + settings.SCORE_INCREMENT, settings.MAX_SCORE)
-        return await self.update(proxy)
-
-    async def get_random(self) -> Proxy | None:
-        """Get a random high-score proxy."""
-        proxies = await self.redis.hvals(self.key)
-        if not proxies:
+        return bool(await self._add(**self._add_args(proxy, time.time())))
+
+    async def add_many(self, proxies: list[Proxy]) -> int:
+        """Add proxies in pipelined chunks of INGEST_BATCH_SIZE."""
+        added = 0
+        size = settings.INGEST_BATCH_SIZE
+        now = time.time()
+        # Drop graveyard entries whose cool-down is over
+        await self.redis.zremrangebyscore(self.graveyard_key, "-inf", now)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for i in range(0, len(proxies), size):
+                for proxy in proxies[i:i + size]:
+                    await self._add(**self._add_args(proxy, now), client=pipe)
+                added += sum(await pipe.execute())
+        if added:
+            await self.redis.publish(self.events_key, "added")
+        return added
+
+    async def delete(self, proxy: Proxy | ProxyRecord):
+        return await self._delete(**self._delete_args(proxy))
+
+    def _adjust_args(self, proxy: ProxyRecord, delta: int, now: float, latency: float | None) -> dict:
+        return {
+            "keys": self._keys,
+            "args": [
+                proxy.string, delta, settings.MIN_SCORE, settings.MAX_SCORE,
+                now, settings.VALIDATE_MIN_INTERVAL, settings.VALIDATE_MAX_INTERVAL,
+                "" if latency is None else latency, settings.LATENCY_EWMA_ALPHA,
+                settings.STATS_BAND_WIDTH, proxy.source or "unknown", proxy.protocol,
+                settings.GRAVEYARD_TTL
+            ],
+        }
+
+    async def adjust_score(self, proxy: ProxyRecord, delta: int, latency: float | None = None) -> int | None:
+        """Run ADJUST_SCORE.
+
+        The score index is the source of truth for scores; the stored JSON
+        keeps only the score the proxy was added with.
+        """
+        score = await self._adjust_score(**self._adjust_args(proxy, delta, time.time(), latency))
+        if score is None:
             return None
-        
-        proxy_list = [Proxy.model_validate_json(p) for p in proxies]
-        max_score = max(p.score for p in proxy_list)
-        best_proxies = [p for p in proxy_list if p.score == max_score]
-        
-        return random.choice(best_proxies)
+        if score <= settings.MIN_SCORE:
+            logger.info(f"Removing proxy {proxy.string} (score {score})")
+        else:
+            proxy.score = score
+        return score
+
+    async def record_results(self, results: list[tuple[ProxyRecord, float | None]]) -> list[int | None]:
+        """Run the score script for every result in one pipelined round trip."""
+        now = time.time()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for proxy, latency in results:
+                delta = -settings.SCORE_DECREMENT if latency is None else settings.SCORE_INCREMENT
+                await self._adjust_score(**self._adjust_args(proxy, delta, now, latency), client=pipe)
+            pipe.publish(self.events_key, "scores")
+            *scores, _ = await pipe.execute()
+        removed = sum(1 for s in scores if s is not None and s <= settings.MIN_SCORE)
+        if removed:
+            logger.info(f"Removed {removed} proxies that reached the minimum score")
+        return scores
+
+    @staticmethod
+    def _hydrate(member, value, score, latency, last_success) -> ProxyRecord | None:
+        if value is None:
+            return None
+        proxy = codec.decode(member, value)
+        if score is not None:
+            proxy.score = int(float(score))
+        proxy.latency = None if latency is None else float(latency)
+        proxy.last_success = None if last_success is None else float(last_success)
+        return proxy
+
+    async def _index_inputs(self) -> tuple[dict[str, float], list[tuple[str, float]]]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zrange(self.score_key, 0, -1, withscores=True)
+            pipe.zrange(self.latency_key, 0, -1, withscores=True)
+            scores, latencies = await pipe.execute()
+        return dict(scores), latencies
+
+    def _hydrate_rows(self, rows: list) -> list[ProxyRecord]:
+        proxies = [self._hydrate(*rows[i:i + 5]) for i in range(0, len(rows), 5)]
+        return [p for p in proxies if p is not None]
+
+    async def _load(self, members: list[str]) -> list[ProxyRecord]:
+        return self._hydrate_rows(await self._load_many(keys=self._keys, args=members))
+
+    async def _pick_best(self, count: int) -> list[ProxyRecord]:
+        rows = await self._pick_best_script(keys=self._keys, args=[count, random.randrange(2 ** 31)])
+        return self._hydrate_rows(rows)
+
+    async def get_all(self) -> list[ProxyRecord]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(self.key)
+            pipe.zrange(self.score_key, 0, -1, withscores=True)
+            pipe.zrange(self.latency_key, 0, -1, withscores=True)
+            pipe.zrange(self.success_key, 0, -1, withscores=True)
+            values, scores, latencies, successes = await pipe.execute()
+        scores, latencies, successes = dict(scores), dict(latencies), dict(successes)
+        return [
+            self._hydrate(member, value, scores.get(member), latencies.get(member), successes.get(member))
+            for member, value in values.items()
+        ]
+
+    async def _scan_raw(self) -> AsyncIterator[dict[str, str]]:
+        cursor = None
+        while cursor != 0:
+            cursor, values = await self.redis.hscan(self.key, cursor or 0, count=settings.SCAN_BATCH_SIZE)
+            if values:
+                yield values
 
-    async def get_all(self) -> list[Proxy]:
-        proxies = await self.redis.hvals(self.key)
-        return [Proxy.model_validate_json(p) for p in proxies]
+    async def _scan_chunks(self) -> AsyncIterator[list[ProxyRecord]]:
+        async for values in self._scan_raw():
+            yield [codec.decode(m, v) for m, v in values.items()]
+
+    async def scan(self) -> AsyncIterator[ProxyRecord]:
+        """Iterate with HSCAN; scores are not hydrated, and a rehash mid-scan may repeat proxies."""
+        async for chunk in self._scan_chunks():
+            for proxy in chunk:
+                yield proxy
+
+    async def scan_pages(
+        self,
+        min_score: int | None = None,
+        protocol: str | None = None,
+        source: str | None = None,
+    ) -> AsyncIterator[list[ProxyRecord]]:
+        """Each page costs one HSCAN and one pipelined ZMSCORE round trip."""
+        async for chunk in self._scan_chunks():
+            chunk = [
+                p for p in chunk
+                if (protocol is None or p.protocol == protocol)
+                and (source is None or p.source == source)
+            ]
+            if not chunk:
+                continue
+            members = [p.string for p in chunk]
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.zmscore(self.score_key, members)
+                pipe.zmscore(self.latency_key, members)
+                pipe.zmscore(self.success_key, members)
+                scores, latencies, successes = await pipe.execute()
+            page = []
+            for proxy, score, latency, last_success in zip(chunk, scores, latencies, successes):
+                if score is None:
+                    continue  # Removed since the HSCAN
+                proxy.score = int(score)
+                proxy.latency = latency
+                proxy.last_success = last_success
+                if min_score is None or proxy.score >= min_score:
+                    page.append(proxy)
+            yield page
+
+    async def claim_due(self, limit: int) -> list[ProxyRecord]:
+        now = time.time()
+        pairs = await self._claim_due(
+            keys=self._keys,
+            args=[now, limit, now + settings.VALIDATE_LEASE]
+        )
+        return [codec.decode(pairs[i], pairs[i + 1]) for i in range(0, len(pairs), 2)]
 
     async def count(self) -> int:
         return await self.redis.hlen(self.key)
 
-storage = RedisClient()
+    async def stats(self) -> dict:
+        """Pool breakdown read from the maintained counters in one round trip."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hlen(self.key)
+            pipe.zcount(self.score_key, settings.MAX_SCORE, "+inf")
+            pipe.hgetall(self.stats_key)
+            pipe.zcount(self.graveyard_key, time.time(), "+inf")
+            total, high_score, counters, buried = await pipe.execute()
+
+        return self._format_stats(total, high_score, counters, buried)
+
+    async def rebuild_stats(self):
+        """Recount the stats counters from scratch with HSCAN.
+
+        Used on startup when the counters are missing, e.g. for pools written
+        before they existed. Not atomic with concurrent writers.
+        """
+        counters: dict[str, int] = {}
+        width = settings.STATS_BAND_WIDTH
+        async for chunk in self._scan_chunks():
+            scores = await self.redis.zmscore(self.score_key, [p.string for p in chunk])
+            for proxy, score in zip(chunk, scores):
+                score = proxy.score if score is None else score
+                for field in (
+                    f"band:{int(score // width)}",
+                    f"source:{proxy.source or 'unknown'}",
+                    f"protocol:{proxy.protocol}",
+                ):
+                    counters[field] = counters.get(field, 0) + 1
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self.stats_key)
+            if counters:
+                pipe.hset(self.stats_key, mapping=counters)
+            await pipe.execute()
+
+    async def sync_index(self):
+        """Backfill the indexes and counters for proxies missing from them.
+
+        Pools written before the indexes existed only have the hash, so this
+        seeds their scores from the stored JSON on startup, makes them due
+        now and recounts the stats counters. Members already indexed keep
+        their live values. It is a no-op when all sides match.
+        """
+        total = await self.count()
+        missing_stats = total and not await self.redis.exists(self.stats_key)
+        if not missing_stats and await self.redis.zcard(self.score_key) == total == await self.redis.zcard(self.due_key):
+            return
+        logger.info("Rebuilding proxy indexes...")
+        now = time.time()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            async for member, value in self.redis.hscan_iter(self.key, count=1000):
+                score = codec.decode(member, value).score
+                pipe.zadd(self.score_key, {member: score}, nx=True)
+                pipe.zadd(self.due_key, {member: now}, nx=True)
+                if len(pipe) >= 1000:
+                    await pipe.execute()
+            await pipe.execute()
+        # Scores may have just been seeded, so recount against them
+        await self.rebuild_stats()
+        logger.info("Proxy indexes rebuilt.")
+
+    async def events(self) -> AsyncIterator[str]:
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(self.events_key)
+            async for message in pubsub.listen():
+                yield message["data"]
+        finally:
+            await pubsub.aclose()
+
+    async def acquire_lease(self, name: str, holder: str, ttl: float) -> bool:
+        key = f"{self.lease_key}:{name}"
+        return bool(await self._acquire_lease(keys=[key], args=[holder, int(ttl * 1000)]))
+
+    async def release_lease(self, name: str, holder: str):
+        await self._release_lease(keys=[f"{self.lease_key}:{name}"], args=[holder])
+
+    async def sync_codec(self):
+        """Rewrite hash values still stored in another format than STORAGE_CODEC.
+
+        Reads accept every format, so the pool keeps serving while this runs.
+        It is a no-op once the pool has been fully written with the current
+        codec; a pool without a marker is assumed to hold JSON.
+        """
+        current = await self.redis.get(self.codec_key) or "json"
+        if current == settings.STORAGE_CODEC:
+            return
+        logger.info(f"Re-encoding proxies from {current} to {settings.STORAGE_CODEC}...")
+        rewritten = 0
+        async for values in self._scan_raw():
+            args = []
+            for member, value in values.items():
+                if not codec.is_current(value):
+                    args += [member, codec.encode(codec.decode(member, value))]
+            if args:
+                rewritten += await self._recode(keys=self._keys, args=args)
+        await self.redis.set(self.codec_key, settings.STORAGE_CODEC)
+        logger.info(f"Re-encoded {rewritten} proxies.")
+
+def _create() -> BaseStorage:
+    if settings.STORAGE_BACKEND == "memory":
+        from proxy_pool.core.memory import MemoryStorage
+        return MemoryStorage()
+    return RedisClient()
+
+storage = _create()
+
+@metrics.collector
+async def _collect_pool():
+    stats = await storage.stats()
+    for band, count in stats["bands"].items():
+        metrics.POOL_PROXIES.labels(band).set(count)
+    metrics.GRAVEYARD.labels().set(stats["graveyard"])
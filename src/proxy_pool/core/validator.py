@@ -1,46 +1,165 @@
 import asyncio
+import time
 import aiohttp
-from proxy_pool.schemas.proxy import Proxy
+from collections.abc import AsyncIterator
+from proxy_pool.schemas.proxy import ProxyRecord
 from proxy_pool.core.storage import storage
+from proxy_pool.utils import metrics
 from proxy_pool.utils.logger import logger
 from proxy_pool.utils.config import settings
 
+_ACTIVE = metrics.PROBES_ACTIVE.labels()
+_PROBE_OK = metrics.PROBE_SECONDS.labels("ok")
+_PROBE_FAIL = metrics.PROBE_SECONDS.labels("fail")
+
 class Validator:
     def __init__(self):
         self.test_url = "http://httpbin.org/get"
-        self.semaphore = asyncio.Semaphore(200)  # Concurrent validation limit
+        self.session: aiohttp.ClientSession | None = None
+        self._pending: list[tuple[ProxyRecord, float | None]] = []
+        self.queue: asyncio.Queue | None = None
+        self._room = asyncio.Event()  # Set whenever a worker takes a proxy off the queue
+
+    async def start(self):
+        """Open the shared HTTP session used for every check."""
+        if self.session and not self.session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=settings.VALIDATE_CONCURRENCY,
+            ttl_dns_cache=settings.VALIDATE_DNS_CACHE_TTL,
+            # Each check goes through a different proxy, so pooled
+            # connections would never be reused and only pile up.
+            force_close=True,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=settings.VALIDATE_TIMEOUT),
+        )
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def check(self, proxy: ProxyRecord) -> float | None:
+        """Probe a proxy once without touching storage.
 
-    async def validate_one(self, proxy: Proxy):
-        """Validate a single proxy and update storage."""
-        async with self.semaphore:
-            proxy_url = f"http://{proxy.string}"
+        Returns the round-trip latency in ms, or None if the check failed.
+        """
+        proxy_url = f"http://{proxy.string}"
+        start = time.perf_counter()
+        latency = None
+        _ACTIVE.inc()
+        try:
+            async with self.session.get(
+                self.test_url,
+                proxy=proxy_url,
+                allow_redirects=False
+            ) as response:
+                if response.status == 200:
+                    latency = (time.perf_counter() - start) * 1000
+        except Exception:
+            pass
+        finally:
+            _ACTIVE.dec()
+        (_PROBE_FAIL if latency is None else _PROBE_OK).observe(time.perf_counter() - start)
+        metrics.PROBES.labels(proxy.source or "unknown", "fail" if latency is None else "ok").inc()
+        return latency
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            proxy = await queue.get()
+            self._room.set()
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        self.test_url, 
-                        proxy=proxy_url, 
-                        timeout=10,
-                        allow_redirects=False
-                    ) as response:
-                        if response.status == 200:
-                            await storage.increase(proxy)
-                            return True
-            except Exception:
-                pass
-            
-            await storage.decrease(proxy)
-            return False
-
-    async def run_validation(self):
-        """Run validation for all stored proxies."""
-        proxies = await storage.get_all()
-        if not proxies:
-            logger.info("No proxies to validate.")
+                latency = await self.check(proxy)
+                self._pending.append((proxy, latency))
+                if len(self._pending) >= settings.VALIDATE_FLUSH_SIZE:
+                    await self._flush()
+            finally:
+                queue.task_done()
+
+    async def _flush(self):
+        """Write pending results; on failure keep them for the next flush."""
+        batch, self._pending = self._pending, []
+        if not batch:
             return
+        try:
+            await storage.record_results(batch)
+        except Exception as e:
+            logger.error(f"Failed to record {len(batch)} validation results, retrying: {e}")
+            self._pending = batch + self._pending
+            await asyncio.sleep(settings.VALIDATE_IDLE_SLEEP)
 
-        logger.info(f"Starting validation for {len(proxies)} proxies...")
-        tasks = [self.validate_one(p) for p in proxies]
-        await asyncio.gather(*tasks)
-        logger.info("Validation cycle complete.")
+    async def _flush_periodically(self, done: asyncio.Event):
+        while not done.is_set():
+            try:
+                await asyncio.wait_for(done.wait(), settings.VALIDATE_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            await self._flush()
+
+    async def _run(self, source: AsyncIterator[ProxyRecord]) -> int:
+        """Feed proxies from `source` through a fixed pool of workers.
+
+        The queue is bounded, so memory stays flat in pool size, and results
+        are written back in pipelined batches as they complete instead of at
+        the end of the run. Returns the number of proxies checked.
+        """
+        await self.start()
+        queue = self.queue = asyncio.Queue(maxsize=settings.VALIDATE_QUEUE_SIZE)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(settings.VALIDATE_CONCURRENCY)]
+        done = asyncio.Event()
+        flusher = asyncio.create_task(self._flush_periodically(done))
+
+        total = 0
+        try:
+            async for proxy in source:
+                await queue.put(proxy)
+                total += 1
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            done.set()
+            await flusher
+        return total
+
+    async def _due(self) -> AsyncIterator[ProxyRecord]:
+        """Claim due proxies as the queue makes room for them.
+
+        Only the free part of the queue is claimed, and only once at least
+        half of it is free: claiming more would leave proxies waiting behind
+        queued work while their VALIDATE_LEASE runs out, and another node
+        would check them again.
+        """
+        queue = self.queue
+        while True:
+            while queue.maxsize - queue.qsize() < max(queue.maxsize // 2, 1):
+                self._room.clear()
+                await self._room.wait()
+            try:
+                proxies = await storage.claim_due(queue.maxsize - queue.qsize())
+            except Exception as e:
+                # A storage outage must not end continuous validation
+                logger.error(f"Failed to claim due proxies, retrying: {e}")
+                proxies = []
+            if not proxies:
+                await asyncio.sleep(settings.VALIDATE_IDLE_SLEEP)
+            for proxy in proxies:
+                yield proxy
+
+    async def run_forever(self):
+        """Continuously validate proxies as their next check comes due.
+
+        Proxies that keep passing are rechecked less and less often, while
+        new and failing ones come back after VALIDATE_MIN_INTERVAL.
+        """
+        logger.info("Continuous validation started.")
+        await self._run(self._due())
 
 validator = Validator()
+
+@metrics.collector
+def _collect_queue():
+    metrics.VALIDATE_QUEUE.labels().set(validator.queue.qsize() if validator.queue else 0)
@@ -1,21 +1,119 @@
+import asyncio
 import aiohttp
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from proxy_pool.schemas.proxy import Proxy
+from proxy_pool.utils.config import settings
 from proxy_pool.utils.logger import logger
 
 class BaseFetcher(ABC):
     name: str = "Base"
+    # Schedule hints: seconds between runs at the expected yield, new proxies
+    # expected per run, and HTTP requests one run costs
+    interval: int = 1800
+    expected_yield: int = 20
+    cost: int = 1
+    # One session shared by every fetcher; its connector caps concurrent requests
+    session: aiohttp.ClientSession | None = None
+
+    def __init__(self):
+        self.yield_avg = float(self.expected_yield)
+        self.next_interval = float(self.interval)
 
     @abstractmethod
     async def fetch(self) -> list[Proxy]:
         pass
 
+    async def stream(self) -> AsyncIterator[Proxy]:
+        """Yield proxies as they are parsed; the scheduler ingests from here.
+
+        Defaults to fetch(). Sources with large responses override it so the
+        whole list is never held at once.
+        """
+        for proxy in await self.fetch():
+            yield proxy
+
+    def record_yield(self, added: int) -> float:
+        """Fold a run's new-proxy count into the yield average and return the next interval.
+
+        Sources beating their expected yield are fetched more often, down to
+        FETCH_MIN_INTERVAL. Sources yielding under FETCH_MIN_YIELD new proxies
+        per request count as dead and back off exponentially, up to
+        FETCH_MAX_INTERVAL, so they are only probed occasionally.
+        """
+        alpha = settings.FETCH_YIELD_ALPHA
+        self.yield_avg = alpha * added + (1 - alpha) * self.yield_avg
+        if self.yield_avg / self.cost < settings.FETCH_MIN_YIELD:
+            interval = self.next_interval * 2
+        else:
+            interval = self.interval * self.expected_yield / self.yield_avg
+        self.next_interval = min(max(interval, settings.FETCH_MIN_INTERVAL), settings.FETCH_MAX_INTERVAL)
+        return self.next_interval
+
+    @staticmethod
+    async def start():
+        """Open the shared HTTP session used by get_html."""
+        if BaseFetcher.session and not BaseFetcher.session.closed:
+            return
+        BaseFetcher.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=settings.FETCH_CONCURRENCY),
+            timeout=aiohttp.ClientTimeout(total=settings.FETCH_TIMEOUT),
+        )
+
+    @staticmethod
+    async def close():
+        if BaseFetcher.session:
+            await BaseFetcher.session.close()
+            BaseFetcher.session = None
+
     async def get_html(self, url: str) -> str | None:
-        async with aiohttp.ClientSession() as session:
+        """GET a page, retrying errors and 429/5xx responses with backoff."""
+        await self.start()
+        for attempt in range(settings.FETCH_RETRIES + 1):
             try:
-                async with session.get(url, timeout=10) as response:
+                async with self.session.get(url) as response:
                     if response.status == 200:
                         return await response.text()
+                    error = f"HTTP {response.status}"
+                    if response.status != 429 and response.status < 500:
+                        break
             except Exception as e:
-                logger.error(f"Fetcher {self.name} failed to get {url}: {e}")
+                error = str(e) or type(e).__name__
+            if attempt < settings.FETCH_RETRIES:
+                await asyncio.sleep(settings.FETCH_BACKOFF * 2 ** attempt)
+        logger.error(f"Fetcher {self.name} failed to get {url}: {error}")
         return None
+
+    async def get_chunks(self, url: str) -> AsyncIterator[bytes]:
+        """GET a body in FETCH_CHUNK_SIZE pieces as it arrives.
+
+        Connecting is retried like get_html; once the body has started, an
+        error ends the stream early with what was read so far. FETCH_TIMEOUT
+        bounds each read rather than the whole download.
+        """
+        await self.start()
+        timeout = aiohttp.ClientTimeout(sock_connect=settings.FETCH_TIMEOUT, sock_read=settings.FETCH_TIMEOUT)
+        started = False
+        for attempt in range(settings.FETCH_RETRIES + 1):
+            try:
+                async with self.session.get(url, timeout=timeout) as response:
+                    if response.status == 200:
+                        started = True
+                        async for chunk in response.content.iter_chunked(settings.FETCH_CHUNK_SIZE):
+                            yield chunk
+                        return
+                    error = f"HTTP {response.status}"
+                    if response.status != 429 and response.status < 500:
+                        break
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                if started:
+                    break
+            if attempt < settings.FETCH_RETRIES:
+                await asyncio.sleep(settings.FETCH_BACKOFF * 2 ** attempt)
+        logger.error(f"Fetcher {self.name} failed to get {url}: {error}")
+
+    async def get_pages(self, urls: list[str]) -> list[str]:
+        """Fetch several pages concurrently, dropping the ones that failed."""
+        pages = await asyncio.gather(*(self.get_html(url) for url in urls))
+        return [html for html in pages if html]
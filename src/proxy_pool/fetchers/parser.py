@@ -0,0 +1,71 @@
+"""Precompiled host:port extraction shared by the fetchers.
+
+Candidates are deduplicated as they are parsed by packing each (IPv4, port)
+pair into one int, which is far smaller than keeping the strings or Proxy
+objects around just to compare them.
+"""
+import re
+from collections.abc import AsyncIterator, Iterator
+
+# <td>1.2.3.4</td> <td ...>8080</td>, as used by the HTML table sources
+HTML_ROW = re.compile(r"(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})</td>\s*<td[^>]*>(\d{1,5})</td>")
+# 1.2.3.4:8080, as used by the plain-text lists
+HOST_PORT = re.compile(rb"(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}):(\d{1,5})")
+
+def pack(host: str, port: int) -> int | None:
+    """Pack an IPv4 address and port into one int, or None if either is invalid."""
+    if not 0 < port < 65536:
+        return None
+    value = 0
+    for octet in host.split("."):
+        octet = int(octet)
+        if octet > 255:
+            return None
+        value = value << 8 | octet
+    return value << 16 | port
+
+class Deduper:
+    """Remembers packed candidates; add() is True only the first time one is seen."""
+
+    def __init__(self):
+        self.seen: set[int] = set()
+
+    def add(self, host: str, port: int) -> bool:
+        key = pack(host, port)
+        if key is None or key in self.seen:
+            return False
+        self.seen.add(key)
+        return True
+
+def _unique(found: list[tuple], deduper: Deduper) -> Iterator[tuple[str, int]]:
+    for host, port in found:
+        if isinstance(host, bytes):
+            host = host.decode()
+        port = int(port)
+        if deduper.add(host, port):
+            yield host, port
+
+def parse_html(html: str, deduper: Deduper | None = None, pattern: re.Pattern = HTML_ROW) -> Iterator[tuple[str, int]]:
+    """Yield unique (host, port) pairs found in a page."""
+    return _unique(pattern.findall(html), deduper or Deduper())
+
+async def parse_stream(
+    chunks: AsyncIterator[bytes],
+    deduper: Deduper | None = None,
+    pattern: re.Pattern = HOST_PORT,
+) -> AsyncIterator[tuple[str, int]]:
+    """Yield unique (host, port) pairs from a line-based body as it downloads.
+
+    Only the current chunk and the unfinished line at its end are held, so
+    memory does not grow with the size of the list.
+    """
+    deduper = deduper or Deduper()
+    tail = b""
+    async for chunk in chunks:
+        data = tail + chunk
+        cut = data.rfind(b"\n") + 1
+        data, tail = data[:cut], data[cut:]
+        for pair in _unique(pattern.findall(data), deduper):
+            yield pair
+    for pair in _unique(pattern.findall(tail), deduper):
+        yield pair
@@ -0,0 +1,48 @@
+from importlib import import_module
+from importlib.metadata import entry_points
+from proxy_pool.fetchers.base import BaseFetcher
+from proxy_pool.fetchers.common import KuaidailiFetcher, ProxyListPlusFetcher
+from proxy_pool.fetchers.text import MonosansFetcher, TheSpeedXFetcher
+from proxy_pool.utils.config import settings
+from proxy_pool.utils.logger import logger
+
+# Packages can ship fetchers by declaring, in their pyproject.toml:
+# [project.entry-points."proxy_pool.fetchers"]
+# myfetcher = "mypackage.fetchers:MyFetcher"
+ENTRY_POINT_GROUP = "proxy_pool.fetchers"
+
+BUILTIN_FETCHERS: list[type[BaseFetcher]] = [
+    KuaidailiFetcher,
+    ProxyListPlusFetcher,
+    TheSpeedXFetcher,
+    MonosansFetcher,
+]
+
+def _load(path: str) -> type[BaseFetcher]:
+    module, _, name = path.partition(":")
+    return getattr(import_module(module), name)
+
+def discover() -> list[BaseFetcher]:
+    """Instantiate every enabled fetcher.
+
+    Built-ins come first, then entry points in ENTRY_POINT_GROUP, then the
+    "module:Class" paths in FETCHERS. The first fetcher registered under a
+    name wins, and names in FETCHERS_DISABLED are skipped.
+    """
+    candidates = [(cls.__name__, lambda cls=cls: cls) for cls in BUILTIN_FETCHERS]
+    candidates += [(ep.name, ep.load) for ep in entry_points(group=ENTRY_POINT_GROUP)]
+    candidates += [(path, lambda path=path: _load(path)) for path in settings.FETCHERS]
+
+    fetchers: dict[str, BaseFetcher] = {}
+    for label, load in candidates:
+        try:
+            cls = load()
+            if not (isinstance(cls, type) and issubclass(cls, BaseFetcher)):
+                raise TypeError(f"{cls!r} is not a BaseFetcher subclass")
+        except Exception as e:
+            logger.error(f"Failed to load fetcher {label}: {e}")
+            continue
+        if cls.name in settings.FETCHERS_DISABLED or cls.name in fetchers:
+            continue
+        fetchers[cls.name] = cls()
+    return list(fetchers.values())
@@ -0,0 +1,36 @@
+from collections.abc import AsyncIterator
+from proxy_pool.fetchers.base import BaseFetcher
+from proxy_pool.fetchers.parser import parse_stream
+from proxy_pool.schemas.proxy import Proxy
+from proxy_pool.utils.logger import logger
+
+class TextListFetcher(BaseFetcher):
+    """Fetcher for plain-text lists with one host:port per line.
+
+    These lists run to hundreds of thousands of lines, so they are parsed
+    while downloading and streamed to storage instead of buffered.
+    """
+    url: str = ""
+    protocol: str = "http"
+
+    async def stream(self) -> AsyncIterator[Proxy]:
+        found = 0
+        async for host, port in parse_stream(self.get_chunks(self.url)):
+            found += 1
+            yield Proxy(host=host, port=port, protocol=self.protocol, source=self.name)
+        logger.info(f"Fetcher {self.name} found {found} proxies")
+
+    async def fetch(self) -> list[Proxy]:
+        return [proxy async for proxy in self.stream()]
+
+class TheSpeedXFetcher(TextListFetcher):
+    name = "thespeedx"
+    url = "https://raw.githubusercontent.com/TheSpeedX/SOCKS-List/master/http.txt"
+    interval = 3600
+    expected_yield = 200
+
+class MonosansFetcher(TextListFetcher):
+    name = "monosans"
+    url = "https://raw.githubusercontent.com/monosans/proxy-list/main/proxies/http.txt"
+    interval = 3600
+    expected_yield = 200
@@ -7,7 +7,49 @@ class Proxy(BaseModel):
     protocol: str = "http"
     anonymous: bool = True
     source: str | None = None
+    latency: float | None = None  # EWMA of successful check latency, in ms
+    last_success: float | None = None  # Unix time of the last passed check
 
     @property
     def string(self) -> str:
         return f"{self.host}:{self.port}"
+
+class ProxyRecord:
+    """Plain read-side copy of a stored proxy.
+
+    Storage hands these out instead of Proxy so hot-path reads skip pydantic
+    validation; they carry the same fields and are only ever built from data
+    that was validated when it was written.
+    """
+
+    __slots__ = ("host", "port", "score", "protocol", "anonymous", "source", "latency", "last_success")
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        score: int,
+        protocol: str = "http",
+        anonymous: bool = True,
+        source: str | None = None,
+        latency: float | None = None,
+        last_success: float | None = None,
+    ):
+        self.host = host
+        self.port = port
+        self.score = score
+        self.protocol = protocol
+        self.anonymous = anonymous
+        self.source = source
+        self.latency = latency
+        self.last_success = last_success
+
+    @property
+    def string(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"ProxyRecord({self.string}, score={self.score}, protocol={self.protocol})"
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Literal
 
 class Settings(BaseSettings):
     # Redis Settings
@@ -14,9 +15,63 @@ class Settings(BaseSettings):
     SCORE_DECREMENT: int = 20
     SCORE_INCREMENT: int = 10
 
+    # Storage Settings
+    STORAGE_BACKEND: Literal["redis", "memory"] = "redis"  # memory: single process, see core/memory.py
+    MEMORY_SNAPSHOT_PATH: str | None = None  # File the memory backend is loaded from and saved to
+    MEMORY_SNAPSHOT_INTERVAL: float = 60  # Seconds between memory snapshots (0: only on shutdown)
+    INGEST_BATCH_SIZE: int = 1000  # Proxies written per pipeline round trip
+    SCAN_BATCH_SIZE: int = 500  # HSCAN COUNT hint when iterating the pool
+    STATS_BAND_WIDTH: int = 10  # Score range covered by each /stats band
+    STORAGE_CODEC: Literal["json", "packed"] = "json"  # Hash value format, see core/codec.py
+    GRAVEYARD_TTL: int = 86400  # Seconds a proxy removed for failing is refused re-adding (0 disables)
+
+    # Validator Settings
+    VALIDATE_CONCURRENCY: int = 200  # Concurrent validation limit
+    VALIDATE_TIMEOUT: float = 10
+    VALIDATE_DNS_CACHE_TTL: int = 300
+    VALIDATE_QUEUE_SIZE: int = 1000  # Proxies buffered between scan and workers
+    VALIDATE_FLUSH_SIZE: int = 200  # Results written per pipeline round trip
+    VALIDATE_FLUSH_INTERVAL: float = 2  # Max seconds a result waits before flushing
+    VALIDATE_MIN_INTERVAL: int = 60  # Recheck delay after a failure
+    VALIDATE_MAX_INTERVAL: int = 1800  # Recheck delay for a MAX_SCORE proxy
+    VALIDATE_LEASE: int = 120  # Seconds a claimed proxy is hidden from other validators
+    VALIDATE_IDLE_SLEEP: float = 1  # Poll delay when nothing is due
+    LATENCY_EWMA_ALPHA: float = 0.3  # Weight of the newest latency sample
+
+    # Fetcher Settings
+    FETCH_CONCURRENCY: int = 20  # Concurrent HTTP requests across all fetchers
+    FETCH_TIMEOUT: float = 10  # Per-request timeout
+    FETCH_DEADLINE: float = 60  # Max seconds one fetcher may take per cycle
+    FETCH_RETRIES: int = 2  # Extra attempts for failed requests
+    FETCH_BACKOFF: float = 1  # First retry delay, doubled on each attempt
+    FETCH_CHUNK_SIZE: int = 65536  # Bytes read at a time from streamed lists
+    FETCH_MIN_INTERVAL: int = 300  # Fastest a productive source is refetched
+    FETCH_MAX_INTERVAL: int = 21600  # Slowest a dead source is retried
+    FETCH_MIN_YIELD: float = 1  # New proxies per request below which a source counts as dead
+    FETCH_YIELD_ALPHA: float = 0.5  # Weight of the latest run in a source's yield average
+    FETCHERS: list[str] = []  # Extra fetchers as "module:Class", besides entry points
+    FETCHERS_DISABLED: list[str] = []  # Fetcher names to skip
+
+    # Cluster Settings
+    ROLE: Literal["all", "api"] = "all"  # api: serve only, leave background work to `proxy-pool worker`
+    LEASE_TTL: float = 30  # Seconds a dead node keeps the fetch lease before another takes over
+
+    # Selection Settings
+    SAMPLER_REFRESH_INTERVAL: float = 5  # Max age in seconds of the fastest/weighted index
+
+    # API Cache Settings
+    CACHE_ENABLED: bool = False  # Serve /get?strategy=best from process memory
+    CACHE_TTL: float = 2  # Max age in seconds of the cached best tiers
+    CACHE_SIZE: int = 1000  # Max proxies held in the cache
+    CACHE_SUBSCRIBE: bool = True  # Also refresh when validators publish score changes
+
     # API Settings
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
+    API_MAX_COUNT: int = 1000  # Upper bound for /get?count=N
+    API_WORKERS: int = 1  # Processes serving `proxy-pool api`
+    API_ACCESS_LOG: bool = False  # Per-request log lines from `proxy-pool api`
+    METRICS_PORT: int = 9100  # Port `proxy-pool worker` serves /metrics on (0 disables)
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
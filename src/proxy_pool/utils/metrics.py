@@ -0,0 +1,193 @@
+"""Prometheus metrics, rendered in the text exposition format by /metrics.
+
+Cheap enough to leave on: each labelled series is created once and cached,
+so recording a sample is a dict lookup plus a few float operations. Hot
+paths resolve their series up front (e.g. STORAGE_SECONDS.labels("add_many")
+at import time) and skip even the lookup. Values are per process; with
+several API workers each one exposes its own, like any multi-process
+Prometheus target. Worker processes serve theirs on METRICS_PORT.
+"""
+import asyncio
+import functools
+import inspect
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+from proxy_pool.utils.logger import logger
+
+_metrics: list["Metric"] = []
+_collectors: list[Callable] = []
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    """Sample value at full precision (:g would freeze counters past 1e6)."""
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.children: dict[tuple[str, ...], object] = {}
+        _metrics.append(self)
+        if not labels:
+            self.labels()  # The single series exists, and renders, from the start
+
+    def _child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        child = self.children.get(values)
+        if child is None:
+            child = self.children[values] = self._child()
+        return child
+
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}{_labels(self.label_names, values)} {_number(child.value)}"
+            for values, child in self.children.items()
+        ]
+
+    def render(self) -> str:
+        head = f"# HELP {self.name} {self.help}\n# TYPE {self.name} {self.kind}\n"
+        return head + "".join(line + "\n" for line in self._samples())
+
+class Counter(Metric):
+    kind = "counter"
+    _child = _Value
+
+class Gauge(Metric):
+    kind = "gauge"
+    _child = _Value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = ()):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labels)
+
+    def _child(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def _samples(self) -> list[str]:
+        lines = []
+        for values, child in self.children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, values)} {_number(child.sum)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, values)} {cumulative}")
+        return lines
+
+def timed(series: _Buckets):
+    """Decorate a coroutine function to observe its duration in seconds into `series`."""
+    def decorate(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                series.observe(time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+def collector(func: Callable) -> Callable:
+    """Register a (sync or async) function that refreshes gauges before each render."""
+    _collectors.append(func)
+    return func
+
+async def render() -> str:
+    for func in _collectors:
+        try:
+            result = func()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.warning(f"Metrics collector {func.__name__} failed: {e}")
+    return "".join(metric.render() for metric in _metrics)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+        body = (await render()).encode()
+        writer.write(
+            f"HTTP/1.1 200 OK\r\nContent-Type: {CONTENT_TYPE}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+    except Exception:
+        pass
+    finally:
+        writer.close()
+
+async def serve(host: str, port: int) -> asyncio.Server:
+    """Expose render() over plain HTTP, for processes without the API."""
+    server = await asyncio.start_server(_handle, host, port)
+    logger.info(f"Serving metrics on {host}:{port}")
+    return server
+
+# Latency buckets in seconds: in-process reads, Redis round trips, network probes
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+GET_SECONDS = Histogram("proxy_pool_get_seconds", "Time to pick proxies for /get", ("strategy",), FAST_BUCKETS)
+STORAGE_SECONDS = Histogram("proxy_pool_storage_seconds", "Storage call duration", ("op",), FAST_BUCKETS)
+PROBE_SECONDS = Histogram("proxy_pool_probe_seconds", "Validation probe duration", ("result",), SLOW_BUCKETS)
+PROBES = Counter("proxy_pool_probes_total", "Validation probes by proxy source and result", ("source", "result"))
+PROBES_ACTIVE = Gauge("proxy_pool_probes_active", "Validation probes in flight")
+VALIDATE_QUEUE = Gauge("proxy_pool_validate_queue", "Claimed proxies waiting for a validation worker")
+FETCH_SECONDS = Histogram("proxy_pool_fetch_seconds", "Duration of one fetcher run", ("fetcher",), SLOW_BUCKETS)
+FETCHED = Counter("proxy_pool_fetched_total", "New proxies added by each fetcher", ("fetcher",))
+FETCH_ERRORS = Counter("proxy_pool_fetch_errors_total", "Fetcher runs that failed or timed out", ("fetcher",))
+CYCLE_SECONDS = Histogram("proxy_pool_cycle_seconds", "Duration of a full fetch cycle", ("task",), SLOW_BUCKETS)
+POOL_PROXIES = Gauge("proxy_pool_proxies", "Stored proxies per score band", ("band",))
+GRAVEYARD = Gauge("proxy_pool_graveyard", "Proxies refused re-adding after failing")
@@ -0,0 +1,57 @@
+"""Background work of a pool node.
+
+Every worker validates proxies as they come due; claim_due leases each batch
+to one worker, so adding workers divides the validation load. Fetchers only
+run on the worker holding the fetch lease. The API starts this in-process
+unless ROLE=api, in which case run the workers separately with
+`proxy-pool worker` (see cli.py).
+"""
+import asyncio
+import sys
+from proxy_pool.core.lease import fetch_lease
+from proxy_pool.core.scheduler import scheduler
+from proxy_pool.core.storage import storage
+from proxy_pool.core.validator import validator
+from proxy_pool.fetchers.base import BaseFetcher
+from proxy_pool.utils import metrics
+from proxy_pool.utils.config import settings
+from proxy_pool.utils.logger import logger
+
+_tasks: list[asyncio.Task] = []
+
+async def start():
+    await validator.start()
+    await fetch_lease.start()
+    scheduler.start()
+
+    # Trigger initial tasks
+    _tasks.append(asyncio.create_task(scheduler.fetch_task()))
+    _tasks.append(asyncio.create_task(scheduler.validate_task()))
+
+async def stop():
+    scheduler.close()
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+    await fetch_lease.close()
+    await validator.close()
+    await BaseFetcher.close()
+
+async def main():
+    if settings.STORAGE_BACKEND == "memory":
+        logger.error("A separate worker can't reach a memory pool; run the API with ROLE=all instead.")
+        sys.exit(1)
+    logger.info("ProxyPool worker starting...")
+    await storage.start()
+    await start()
+    # The API serves /metrics itself; a separate worker needs its own endpoint
+    server = await metrics.serve(settings.API_HOST, settings.METRICS_PORT) if settings.METRICS_PORT else None
+    try:
+        await asyncio.Event().wait()
+    finally:
+        logger.info("ProxyPool worker shutting down...")
+        if server:
+            server.close()
+        await stop()
+        await storage.close()
@@ -17,6 +17,8 @@ async def run_test_suite(name: str, module_name: str) -> dict:
             from test_storage import run_all_tests
         elif module_name == "test_integration":
             from test_integration import run_all_tests
+        elif module_name == "test_metrics":
+            from test_metrics import run_all_tests
         else:
             return {"suite": name, "status": "✗ 失败", "error": "未知测试套件"}
         
@@ -39,6 +41,7 @@ async def main() -> None:
         ("API 端点测试", "test_api"),
         ("存储功能测试", "test_storage"),
         ("集成测试", "test_integration"),
+        ("指标测试", "test_metrics"),
     ]
     
     results = []
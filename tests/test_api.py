@@ -1,6 +1,7 @@
 # API端点测试 - 验证所有API接口的功能和响应格式
 import httpx
 import asyncio
+import json
 from typing import Any
 
 
@@ -35,6 +36,10 @@ async def test_get_stats() -> dict[str, Any]:
             assert "status" in data
             assert isinstance(data["total"], int)
             assert isinstance(data["high_score"], int)
+            # 分数段/来源/协议计数
+            assert sum(data["bands"].values()) == data["total"]
+            assert sum(data["sources"].values()) == data["total"]
+            assert sum(data["protocols"].values()) == data["total"]
             
             return {"test": "get_stats", "status": "✓ 通过", "data": data}
         except Exception as e:
@@ -101,6 +106,55 @@ async def test_get_proxy_text() -> dict[str, Any]:
             return {"test": "get_proxy_text", "status": "✗ 失败", "error": str(e)}
 
 
+async def test_get_proxy_batch() -> dict[str, Any]:
+    """测试批量获取代理（count 参数）"""
+    async with httpx.AsyncClient() as client:
+        try:
+            response = await client.get(f"{BASE_URL}/get?count=5", timeout=10.0)
+            
+            if response.status_code == 503:
+                return {"test": "get_proxy_batch", "status": "⚠ 代理池为空", "note": "等待抓取"}
+            
+            assert response.status_code == 200
+            data = response.json()
+            assert isinstance(data, list), "响应应该是列表"
+            assert 1 <= len(data) <= 5, f"返回数量异常: {len(data)}"
+            
+            # 返回的代理不应重复
+            proxies = [f"{p['host']}:{p['port']}" for p in data]
+            assert len(set(proxies)) == len(proxies), "返回了重复的代理"
+            
+            text_response = await client.get(f"{BASE_URL}/get?count=5&format=text", timeout=10.0)
+            assert text_response.status_code == 200
+            lines = text_response.text.splitlines()
+            assert all(":" in line for line in lines), "代理格式应为 host:port"
+            
+            return {"test": "get_proxy_batch", "status": "✓ 通过", "count": len(data)}
+        except Exception as e:
+            return {"test": "get_proxy_batch", "status": "✗ 失败", "error": str(e)}
+
+
+async def test_get_all_filtered() -> dict[str, Any]:
+    """测试 /all 的 NDJSON 流式输出与过滤参数"""
+    async with httpx.AsyncClient() as client:
+        try:
+            response = await client.get(
+                f"{BASE_URL}/all?format=ndjson&min_score=10&protocol=http&limit=3", timeout=10.0
+            )
+            assert response.status_code == 200
+            lines = response.text.splitlines()
+            assert len(lines) <= 3, f"返回数量超过 limit: {len(lines)}"
+            
+            for line in lines:
+                proxy = json.loads(line)
+                assert proxy["score"] >= 10, "min_score 过滤失效"
+                assert proxy["protocol"] == "http", "protocol 过滤失效"
+            
+            return {"test": "get_all_filtered", "status": "✓ 通过", "count": len(lines)}
+        except Exception as e:
+            return {"test": "get_all_filtered", "status": "✗ 失败", "error": str(e)}
+
+
 async def run_all_tests() -> None:
     """运行所有API测试"""
     print("=" * 60)
@@ -113,6 +167,8 @@ async def run_all_tests() -> None:
         test_get_all_proxies,
         test_get_proxy_json,
         test_get_proxy_text,
+        test_get_proxy_batch,
+        test_get_all_filtered,
     ]
     
     results = []
@@ -0,0 +1,135 @@
+# 指标测试 - 验证 Prometheus 文本格式的输出与独立的指标 HTTP 端点
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from proxy_pool.utils import metrics
+
+
+async def test_render_format() -> dict:
+    """测试带标签的计数器与直方图的输出文本（累计桶、+Inf、标签转义）"""
+    try:
+        counter = metrics.Counter("test_requests_total", "Requests handled", ("path",))
+        counter.labels('/a"b\\c\n').inc()
+        counter.labels("/get").inc(2)
+
+        histogram = metrics.Histogram("test_seconds", "Request duration", ("op",), (0.1, 1))
+        series = histogram.labels("read")
+        for value in (0.05, 0.1, 0.5, 3):
+            series.observe(value)
+
+        expected_counter = (
+            "# HELP test_requests_total Requests handled\n"
+            "# TYPE test_requests_total counter\n"
+            'test_requests_total{path="/a\\"b\\\\c\\n"} 1\n'
+            'test_requests_total{path="/get"} 2\n'
+        )
+        expected_histogram = (
+            "# HELP test_seconds Request duration\n"
+            "# TYPE test_seconds histogram\n"
+            'test_seconds_bucket{op="read",le="0.1"} 2\n'
+            'test_seconds_bucket{op="read",le="1"} 3\n'
+            'test_seconds_bucket{op="read",le="+Inf"} 4\n'
+            'test_seconds_sum{op="read"} 3.65\n'
+            'test_seconds_count{op="read"} 4\n'
+        )
+        if counter.render() == expected_counter and histogram.render() == expected_histogram:
+            return {"test": "render_format", "status": "✓ 通过"}
+        return {
+            "test": "render_format", "status": "✗ 失败",
+            "error": f"输出不符:\n{counter.render()}{histogram.render()}",
+        }
+    except Exception as e:
+        return {"test": "render_format", "status": "✗ 失败", "error": str(e)}
+
+
+async def test_large_values() -> dict:
+    """测试超过 1e6 的计数器保留全部有效数字，否则 rate() 会读到零增长"""
+    try:
+        counter = metrics.Counter("test_probes_total", "Probes made")
+        counter.labels().inc(1234567)
+        before = counter.render()
+        counter.labels().inc(3)
+        after = counter.render()
+
+        histogram = metrics.Histogram("test_latency_seconds", "Latency", buckets=(1,))
+        histogram.labels().observe(1234567.25)
+
+        if (
+            before.endswith("test_probes_total 1234567\n")
+            and after.endswith("test_probes_total 1234570\n")
+            and "test_latency_seconds_sum 1234567.25\n" in histogram.render()
+        ):
+            return {"test": "large_values", "status": "✓ 通过"}
+        return {"test": "large_values", "status": "✗ 失败", "error": f"输出不符:\n{before}{after}{histogram.render()}"}
+    except Exception as e:
+        return {"test": "large_values", "status": "✗ 失败", "error": str(e)}
+
+
+async def test_serve() -> dict:
+    """测试独立进程使用的指标端点能通过 HTTP 返回指标"""
+    server = None
+    try:
+        server = await metrics.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        response = (await reader.read()).decode()
+        writer.close()
+
+        head, _, body = response.partition("\r\n\r\n")
+        if (
+            head.startswith("HTTP/1.1 200")
+            and f"Content-Type: {metrics.CONTENT_TYPE}" in head
+            and f"Content-Length: {len(body.encode())}" in head
+            and "# TYPE proxy_pool_probes_total counter" in body
+        ):
+            return {"test": "serve", "status": "✓ 通过"}
+        return {"test": "serve", "status": "✗ 失败", "error": f"响应异常: {head}"}
+    except Exception as e:
+        return {"test": "serve", "status": "✗ 失败", "error": str(e)}
+    finally:
+        if server:
+            server.close()
+
+
+async def run_all_tests() -> None:
+    """运行所有指标测试"""
+    print("=" * 60)
+    print("开始运行 指标 测试套件")
+    print("=" * 60)
+
+    tests = [
+        test_render_format,
+        test_large_values,
+        test_serve,
+    ]
+
+    results = []
+    for test_func in tests:
+        print(f"\n运行测试: {test_func.__name__}")
+        result = await test_func()
+        results.append(result)
+        print(f"  结果: {result['status']}")
+        if "error" in result:
+            print(f"  错误: {result['error']}")
+
+    print("\n" + "=" * 60)
+    print("测试总结")
+    print("=" * 60)
+
+    passed = sum(1 for r in results if "✓" in r["status"])
+    failed = sum(1 for r in results if "✗" in r["status"])
+
+    print(f"总计: {len(results)} 个测试")
+    print(f"通过: {passed} ✓")
+    print(f"失败: {failed} ✗")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_all_tests())
@@ -1,11 +1,17 @@
-# Redis存储功能测试 - 验证代理的增删改查和评分机制
+# 存储功能测试 - 验证代理的增删改查和评分机制
 import asyncio
+import os
 import sys
+import tempfile
 from pathlib import Path
 
 # 添加src目录到路径
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+# 默认使用内存后端，无需 Redis；STORAGE_BACKEND=redis 时测试 Redis
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from proxy_pool.core import codec
 from proxy_pool.core.storage import storage
 from proxy_pool.schemas.proxy import Proxy
 from proxy_pool.utils.config import settings
@@ -28,6 +34,24 @@ async def test_add_proxy() -> dict:
         return {"test": "add_proxy", "status": "✗ 失败", "error": str(e)}
 
 
+async def test_add_many() -> dict:
+    """测试批量添加代理（已存在的代理不会被覆盖）"""
+    try:
+        test_proxies = [Proxy(host="30.30.30.30", port=8000 + i, source="test") for i in range(5)]
+        # 同一批次中包含重复代理
+        added = await storage.add_many(test_proxies + test_proxies[:2])
+        added_again = await storage.add_many(test_proxies)
+        
+        all_proxies = await storage.get_all()
+        found = sum(1 for p in all_proxies if p.host == "30.30.30.30")
+        
+        if found == 5 and added_again == 0:
+            return {"test": "add_many", "status": "✓ 通过", "added": added}
+        return {"test": "add_many", "status": "✗ 失败", "error": f"批量添加结果异常: found={found}, added_again={added_again}"}
+    except Exception as e:
+        return {"test": "add_many", "status": "✗ 失败", "error": str(e)}
+
+
 async def test_increase_score() -> dict:
     """测试增加代理评分"""
     try:
@@ -111,6 +135,65 @@ async def test_get_random() -> dict:
         return {"test": "get_random", "status": "✗ 失败", "error": str(e)}
 
 
+async def test_codec_roundtrip() -> dict:
+    """测试 json/packed 两种编码都能正确还原代理"""
+    original = settings.STORAGE_CODEC
+    try:
+        test_proxy = Proxy(host="40.40.40.40", port=3128, score=30, protocol="socks5", anonymous=False, source="test")
+        for name in ("json", "packed"):
+            settings.STORAGE_CODEC = name
+            record = codec.decode(test_proxy.string, codec.encode(test_proxy))
+            fields = (record.host, record.port, record.score, record.protocol, record.anonymous, record.source)
+            assert fields == ("40.40.40.40", 3128, 30, "socks5", False, "test"), f"{name} 编码还原错误: {fields}"
+        return {"test": "codec_roundtrip", "status": "✓ 通过"}
+    except Exception as e:
+        return {"test": "codec_roundtrip", "status": "✗ 失败", "error": str(e)}
+    finally:
+        settings.STORAGE_CODEC = original
+
+
+async def test_claim_due() -> dict:
+    """测试到期代理被领取后，在租约期内不会被重复领取"""
+    try:
+        test_proxy = Proxy(host="50.50.50.50", port=8888, source="test")
+        await storage.add(test_proxy)
+
+        first = [p.string for p in await storage.claim_due(100000)]
+        second = [p.string for p in await storage.claim_due(100000)]
+
+        if test_proxy.string in first and test_proxy.string not in second:
+            return {"test": "claim_due", "status": "✓ 通过"}
+        return {"test": "claim_due", "status": "✗ 失败", "error": f"领取结果异常: first={test_proxy.string in first}, second={test_proxy.string in second}"}
+    except Exception as e:
+        return {"test": "claim_due", "status": "✗ 失败", "error": str(e)}
+
+
+async def test_snapshot_roundtrip() -> dict:
+    """测试内存后端快照保存后能完整恢复"""
+    if settings.STORAGE_BACKEND != "memory":
+        return {"test": "snapshot_roundtrip", "status": "⚠ 跳过", "reason": "仅适用于内存后端"}
+    try:
+        from proxy_pool.core.memory import MemoryStorage
+
+        test_proxy = Proxy(host="60.60.60.60", port=1080, score=40, protocol="socks5", source="test")
+        await storage.add(test_proxy)
+        await storage.increase(test_proxy, latency=120.0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "pool.json")
+            await storage.save_snapshot(path)
+            restored = MemoryStorage()
+            restored.load_snapshot(path)
+
+        proxy = next((p for p in await restored.get_all() if p.string == test_proxy.string), None)
+        assert proxy is not None, "快照中缺少代理"
+        assert (proxy.score, proxy.protocol, proxy.latency) == (50, "socks5", 120.0), f"字段未还原: {proxy}"
+        assert await restored.stats() == await storage.stats(), "统计计数不一致"
+        return {"test": "snapshot_roundtrip", "status": "✓ 通过"}
+    except Exception as e:
+        return {"test": "snapshot_roundtrip", "status": "✗ 失败", "error": str(e)}
+
+
 async def test_count() -> dict:
     """测试代理计数"""
     try:
@@ -130,10 +213,14 @@ async def run_all_tests() -> None:
     
     tests = [
         test_add_proxy,
+        test_add_many,
         test_increase_score,
         test_decrease_score,
         test_auto_remove_low_score,
         test_get_random,
+        test_codec_roundtrip,
+        test_claim_due,
+        test_snapshot_roundtrip,
         test_count,
     ]
     